@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import sys
 from typing import Optional
 
 from .evaluator import Evaluator
@@ -11,6 +12,8 @@ from .planner import Planner
 
 logger = logging.getLogger(__name__)
 
+_EMPTY_PLAN_HINT = "前回の計画は空でした。目的の達成に向けて実行可能なステップを少なくとも1つ提案してください。"
+
 
 class Agent:
     """Combines planning, execution, and evaluation into a ReAct-style loop."""
@@ -22,60 +25,53 @@ class Agent:
         evaluator: Evaluator,
         history: Optional[ExecutionHistory] = None,
         max_iterations: int = 10,
+        max_empty_plans: int = 2,
+        history_window: Optional[int] = 50,
     ) -> None:
-        print(
-            "[agent/agent.py][Agent.__init__][Start] "
-            f"planner={planner} executor={executor} evaluator={evaluator} "
-            f"history={history} max_iterations={max_iterations}"
-        )
         self.planner = planner
         self.executor = executor
         self.evaluator = evaluator
-        self.history = history or ExecutionHistory()
+        self.history = history if history is not None else ExecutionHistory(window=history_window)
         self.max_iterations = max_iterations
-        print(
-            "[agent/agent.py][Agent.__init__][End] "
-            f"history={self.history} max_iterations={self.max_iterations}"
-        )
+        self.max_empty_plans = max_empty_plans
 
     def run(self, goal: str) -> None:
         """Run the agent loop for the provided goal."""
-        print(
-            "[agent/agent.py][Agent.run][Start] "
-            f"goal={goal} max_iterations={self.max_iterations}"
-        )
+        logger.debug("Agent run started: goal=%s max_iterations=%s", goal, self.max_iterations)
+        empty_plans = 0
         for iteration in range(1, self.max_iterations + 1):
             logger.info("Planning iteration %s", iteration)
-            plan_steps = self.planner.create_plan(goal, self.history, self.executor.mcp_client)
+            plan_steps = self.planner.create_plan(
+                goal,
+                self.history,
+                self.executor.mcp_client,
+                hint=_EMPTY_PLAN_HINT if empty_plans else "",
+            )
+            if not plan_steps:
+                # Nothing was executed, so evaluating again could not change the verdict.
+                empty_plans += 1
+                logger.warning("Planner returned an empty plan (%s in a row)", empty_plans)
+                if empty_plans >= self.max_empty_plans:
+                    sys.stdout.write("⚠️ プランが生成されませんでした。目的の達成を中断します。\n")
+                    logger.debug("Agent run finished: status=no_plan iteration=%s", iteration)
+                    return
+                continue
+            empty_plans = 0
+
             execution_pairs = self.executor.execute_plan(plan_steps)
 
-            latest_results = []
-            for step, result in execution_pairs:
-                self.history.add_step(
-                    iteration=iteration,
-                    plan_summary=step.summary,
-                    server=step.server,
-                    action=step.action,
-                    parameters=str(step.parameters),
-                    result=result.output,
-                )
-                latest_results.append(result)
+            self.history.extend(execution_pairs, iteration)
+            latest_results = [result for _, result in execution_pairs]
 
             evaluation = self.evaluator.assess_goal(goal, self.history, latest_results)
             logger.info("Evaluation: %s", evaluation.reason)
             if evaluation.achieved:
-                print("✅ 目的を達成しました。")
-                print(f"理由: {evaluation.reason}")
-                print(
-                    "[agent/agent.py][Agent.run][End] "
-                    f"status=achieved iteration={iteration} reason={evaluation.reason}"
-                )
+                sys.stdout.write(f"✅ 目的を達成しました。\n理由: {evaluation.reason}\n")
+                logger.debug("Agent run finished: status=achieved iteration=%s", iteration)
                 return
 
-        print("⚠️ 目的を達成できませんでした。追加の指示が必要かもしれません。")
-        print("最終的な実行履歴:")
-        print(self.history.to_prompt())
-        print(
-            "[agent/agent.py][Agent.run][End] status=not_achieved "
-            f"iterations={self.max_iterations}"
+        sys.stdout.write(
+            "⚠️ 目的を達成できませんでした。追加の指示が必要かもしれません。\n"
+            f"最終的な実行履歴:\n{self.history.to_prompt()}\n"
         )
+        logger.debug("Agent run finished: status=not_achieved iterations=%s", self.max_iterations)
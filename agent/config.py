@@ -1,15 +1,21 @@
 """Configuration utilities for the MCP client agent."""
 from __future__ import annotations
 
-import json
+import functools
+import logging
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Tuple, TypeVar
 
+from . import json_codec
 from .mcp_metadata import get_server_functions
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
 class MCPServerDefinition:
     """Represents a single MCP server registration."""
 
@@ -23,32 +29,51 @@ class ConfigurationError(RuntimeError):
     """Raised when configuration files are missing or malformed."""
 
 
+def _mtime_cache(loader: Callable[[Path], T]) -> Callable[[Path], T]:
+    """Reuse a loader's result until the file's modification time or size changes.
+
+    Cached results are shared between callers and must not be mutated.
+    """
+    cache: Dict[Path, Tuple[int, int, T]] = {}
+
+    @functools.wraps(loader)
+    def wrapper(path: Path) -> T:
+        try:
+            stat = path.stat()
+        except OSError:
+            # Let the loader report the missing or unreadable file.
+            return loader(path)
+        cached = cache.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        result = loader(path)
+        cache[path] = (stat.st_mtime_ns, stat.st_size, result)
+        return result
+
+    return wrapper
+
+
+@_mtime_cache
 def load_system_prompt(path: Path) -> str:
     """Load the system prompt from the provided path."""
-    print(
-        "[agent/config.py][load_system_prompt][Start] "
-        f"path={path}"
-    )
-    if not path.exists():
-        raise ConfigurationError(f"System prompt file not found: {path}")
-    prompt = path.read_text(encoding="utf-8").strip()
-    print(
-        "[agent/config.py][load_system_prompt][End] "
-        f"length={len(prompt)}"
-    )
+    try:
+        prompt = path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError as exc:
+        raise ConfigurationError(f"System prompt file not found: {path}") from exc
+    logger.debug("Loaded system prompt from %s (%s characters)", path, len(prompt))
     return prompt
 
 
+@_mtime_cache
 def load_mcp_servers(path: Path) -> Dict[str, MCPServerDefinition]:
     """Load MCP server definitions from the given JSON file."""
-    print(
-        "[agent/config.py][load_mcp_servers][Start] "
-        f"path={path}"
-    )
-    if not path.exists():
-        raise ConfigurationError(f"MCP server configuration not found: {path}")
-
-    data = json.loads(path.read_text(encoding="utf-8"))
+    try:
+        with path.open("rb") as handle:
+            raw = handle.read()
+    except FileNotFoundError as exc:
+        raise ConfigurationError(f"MCP server configuration not found: {path}") from exc
+
+    data = json_codec.loads(raw)
     servers = data.get("mcpServers")
     if not isinstance(servers, dict):
         raise ConfigurationError("Invalid MCP configuration: 'mcpServers' missing or not an object")
@@ -71,17 +96,16 @@ def load_mcp_servers(path: Path) -> Dict[str, MCPServerDefinition]:
         registry[name] = MCPServerDefinition(
             name=name,
             command=command,
-            args=[str(arg) for arg in args],
-            env={str(key): str(value) for key, value in env.items()},
-        )
-        functions = get_server_functions(name)
-        print(
-            "[agent/config.py][load_mcp_servers][Info] "
-            f"server_name={name} functions={functions}"
+            # Values parsed from JSON are nearly always strings already; only
+            # build converted copies when something actually needs coercing.
+            args=args if all(type(arg) is str for arg in args) else [str(arg) for arg in args],
+            env=(
+                env
+                if all(type(value) is str for value in env.values())
+                else {key: str(value) for key, value in env.items()}
+            ),
         )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Registered MCP server %s with functions %s", name, get_server_functions(name))
 
-    print(
-        "[agent/config.py][load_mcp_servers][End] "
-        f"server_count={len(registry)}"
-    )
     return registry
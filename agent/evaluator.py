@@ -1,16 +1,35 @@
 """Goal completion evaluation using the LLM."""
 from __future__ import annotations
 
-import json
+import logging
+from contextlib import closing
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Dict, Iterable, List
 
+from . import json_codec
 from .history import ExecutionHistory
-from .llm import CompletionMessage, LLMClient
+from .llm import CompletionMessage, LLMClient, prompt_cache_key
 from .mcp_client import MCPActionResult
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+_USER_PROMPT_TEMPLATE = """目的: {goal}
+
+実行履歴の要約:
+{history}
+
+最新の実行結果:
+{latest}
+
+上記の情報をもとに目的が達成されたか評価してください。
+以下のJSONのみで回答してください。
+{{
+  "goalAchieved": true または false,
+  "reason": "判断の根拠"
+}}"""
+
+
+@dataclass(slots=True)
 class EvaluationResult:
     achieved: bool
     reason: str
@@ -20,16 +39,9 @@ class Evaluator:
     """Determines whether the user's goal has been achieved."""
 
     def __init__(self, llm: LLMClient, system_prompt: str) -> None:
-        print(
-            "[agent/evaluator.py][Evaluator.__init__][Start] "
-            f"llm={llm} system_prompt_length={len(system_prompt)}"
-        )
         self.llm = llm
         self.system_prompt = system_prompt
-        print(
-            "[agent/evaluator.py][Evaluator.__init__][End] "
-            f"system_prompt_length={len(self.system_prompt)}"
-        )
+        self._cache_key = prompt_cache_key(system_prompt)
 
     def assess_goal(
         self,
@@ -38,57 +50,51 @@ class Evaluator:
         latest_results: List[MCPActionResult],
     ) -> EvaluationResult:
         """Ask the LLM whether the goal has been satisfied."""
-        print(
-            "[agent/evaluator.py][Evaluator.assess_goal][Start] "
-            f"goal={goal} latest_results_count={len(latest_results)}"
-        )
-        latest_summary = "\n\n".join(
-            [
-                "\n".join(
-                    [
-                        f"Server: {result.server}",
-                        f"Action: {result.action}",
-                        f"Parameters: {json.dumps(result.parameters, ensure_ascii=False)}",
-                        f"Output: {result.output}",
-                    ]
-                )
-                for result in latest_results
-            ]
-        ) or "(No actions executed in this iteration.)"
-
-        user_prompt = f"""
-目的: {goal}
+        parts: List[str] = []
+        append = parts.append
+        for result in latest_results:
+            append(
+                f"Server: {result.server}\nAction: {result.action}\n"
+                f"Parameters: {result.parameters_json}\nOutput: {result.output}\n\n"
+            )
+        latest_summary = "".join(parts).rstrip() or "(No actions executed in this iteration.)"
 
-実行履歴の要約:
-{history.to_prompt()}
-
-最新の実行結果:
-{latest_summary}
-
-上記の情報をもとに目的が達成されたか評価してください。
-以下のJSONのみで回答してください。
-{{
-  "goalAchieved": true または false,
-  "reason": "判断の根拠"
-}}
-"""
-        response = self.llm.complete(
+        user_prompt = _USER_PROMPT_TEMPLATE.format_map(
+            {"goal": goal, "history": history.to_prompt(), "latest": latest_summary}
+        )
+        chunks = self.llm.stream(
             [
                 CompletionMessage(role="system", content=self.system_prompt),
-                CompletionMessage(role="user", content=user_prompt.strip()),
+                CompletionMessage(role="user", content=user_prompt),
             ],
+            cache_key=self._cache_key,
             temperature=0.0,
         )
-        try:
-            payload = json.loads(response)
-        except json.JSONDecodeError as exc:
-            raise ValueError("Evaluation response was not valid JSON") from exc
+        with closing(chunks):
+            payload = self._read_evaluation(chunks)
 
         achieved = bool(payload.get("goalAchieved"))
         reason = str(payload.get("reason", ""))
-        result = EvaluationResult(achieved=achieved, reason=reason)
-        print(
-            "[agent/evaluator.py][Evaluator.assess_goal][End] "
-            f"achieved={result.achieved} reason={result.reason}"
-        )
-        return result
+        logger.debug("Evaluation result: achieved=%s reason=%s", achieved, reason)
+        return EvaluationResult(achieved=achieved, reason=reason)
+
+    @staticmethod
+    def _read_evaluation(chunks: Iterable[str]) -> Dict[str, Any]:
+        """Parse the streamed evaluation, stopping as soon as a full JSON object arrived."""
+        received: List[str] = []
+        for chunk in chunks:
+            received.append(chunk)
+            if not chunk.rstrip().endswith("}"):
+                continue
+            text = "".join(received).strip()
+            if not text.startswith("{"):
+                continue
+            try:
+                return json_codec.loads(text)
+            except json_codec.JSONDecodeError:
+                continue
+
+        try:
+            return json_codec.loads("".join(received))
+        except json_codec.JSONDecodeError as exc:
+            raise ValueError("Evaluation response was not valid JSON") from exc
@@ -1,42 +1,76 @@
 """Execution logic for running planned MCP actions."""
 from __future__ import annotations
 
-from typing import List, Tuple
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 from .mcp_client import MCPActionResult, MCPClient
 from .planner import PlanStep
 
+logger = logging.getLogger(__name__)
+
 
 class Executor:
     """Executes plan steps using the configured MCP client."""
 
     def __init__(self, mcp_client: MCPClient) -> None:
-        print(
-            "[agent/executor.py][Executor.__init__][Start] "
-            f"mcp_client={mcp_client}"
-        )
         self.mcp_client = mcp_client
-        print(
-            "[agent/executor.py][Executor.__init__][End] mcp_client_set=True"
-        )
 
     def execute_plan(self, plan_steps: List[PlanStep]) -> List[Tuple[PlanStep, MCPActionResult]]:
-        """Execute each step of the plan sequentially."""
-        print(
-            "[agent/executor.py][Executor.execute_plan][Start] "
-            f"plan_steps_count={len(plan_steps)}"
-        )
-        results: List[Tuple[PlanStep, MCPActionResult]] = []
+        """Execute the plan, running independent steps concurrently.
+
+        A step with ``depends_on`` set waits for that earlier step to finish.
+        Results are returned in plan order.
+        """
+        if len(plan_steps) <= 1:
+            return [self._execute_step(step) for step in plan_steps]
+
+        with ThreadPoolExecutor(max_workers=len(plan_steps)) as pool:
+            futures: List[Future[Tuple[PlanStep, MCPActionResult]]] = []
+            for step in plan_steps:
+                dependency = futures[step.depends_on] if step.depends_on is not None else None
+                futures.append(pool.submit(self._execute_after, step, dependency))
+            return [future.result() for future in futures]
+
+    async def execute_plan_async(self, plan_steps: List[PlanStep]) -> List[Tuple[PlanStep, MCPActionResult]]:
+        """Asynchronous counterpart of :meth:`execute_plan`."""
+        tasks: List[asyncio.Task[Tuple[PlanStep, MCPActionResult]]] = []
         for step in plan_steps:
-            print(
-                "[agent/executor.py][Executor.execute_plan][Info] "
-                f"Executing MCP server action server={step.server} action={step.action} "
-                f"parameters={step.parameters}"
-            )
-            action_result = self.mcp_client.execute(step.server, step.action, step.parameters)
-            results.append((step, action_result))
-        print(
-            "[agent/executor.py][Executor.execute_plan][End] "
-            f"executed_steps={len(results)}"
+            dependency = tasks[step.depends_on] if step.depends_on is not None else None
+            tasks.append(asyncio.ensure_future(self._execute_after_async(step, dependency)))
+        return list(await asyncio.gather(*tasks))
+
+    def _execute_after(
+        self,
+        step: PlanStep,
+        dependency: Optional[Future[Tuple[PlanStep, MCPActionResult]]],
+    ) -> Tuple[PlanStep, MCPActionResult]:
+        if dependency is not None:
+            dependency.result()
+        return self._execute_step(step)
+
+    async def _execute_after_async(
+        self,
+        step: PlanStep,
+        dependency: Optional[asyncio.Task[Tuple[PlanStep, MCPActionResult]]],
+    ) -> Tuple[PlanStep, MCPActionResult]:
+        if dependency is not None:
+            await dependency
+        # MCPClient.execute is blocking, so keep it off the event loop.
+        return await asyncio.to_thread(self._execute_step, step)
+
+    def _execute_step(self, step: PlanStep) -> Tuple[PlanStep, MCPActionResult]:
+        logger.debug(
+            "Executing MCP server action server=%s action=%s parameters=%s",
+            step.server,
+            step.action,
+            step.parameters_json,
+        )
+        return step, self.mcp_client.execute(
+            step.server,
+            step.action,
+            step.parameters,
+            parameters_json=step.parameters_json,
         )
-        return results
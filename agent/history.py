@@ -1,11 +1,17 @@
 """Execution history tracking for the agent."""
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List
+from itertools import chain, groupby, islice
+from typing import TYPE_CHECKING, Deque, Iterable, List, Optional, Tuple
 
+if TYPE_CHECKING:
+    from .mcp_client import MCPActionResult
+    from .planner import PlanStep
 
-@dataclass
+
+@dataclass(slots=True)
 class StepRecord:
     """Represents a single execution step in the agent loop."""
 
@@ -15,13 +21,48 @@ class StepRecord:
     action: str
     parameters: str
     result: str
+    rendered: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Formatted once here so ``ExecutionHistory.to_prompt`` only has to join.
+        self.rendered = "\n".join(
+            (
+                f"Iteration: {self.iteration}",
+                f"Plan summary: {self.plan_summary}",
+                f"Server: {self.server}",
+                f"Action: {self.action}",
+                f"Parameters: {self.parameters}",
+                f"Result: {self.result}",
+            )
+        )
 
 
 @dataclass
 class ExecutionHistory:
-    """Keeps track of the executed steps."""
+    """Keeps track of the executed steps.
+
+    At most ``window`` steps are kept (``None`` keeps all of them). Steps that fall
+    out of the window are reduced to a one-line summary per iteration so the
+    earlier progress remains visible. Only the plan summaries of the last
+    ``summary_limit`` dropped steps are kept and older ones are just counted,
+    so the prompt stays bounded.
+    """
 
-    steps: List[StepRecord] = field(default_factory=list)
+    steps: Deque[StepRecord] = field(default_factory=deque)
+    window: Optional[int] = 50
+    summary_limit: int = 50
+    _omitted: Deque[Tuple[int, str]] = field(default_factory=deque, init=False, repr=False)
+    _omitted_dropped: int = field(default=0, init=False, repr=False)
+    _rendered_prefix: str = field(default="", init=False, repr=False)
+    _rendered_count: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.window is not None and self.window < 1:
+            raise ValueError("History window must be at least 1")
+        initial_steps = list(self.steps)
+        self.steps = deque(maxlen=self.window)
+        self._omitted = deque(maxlen=self.summary_limit)
+        self._append(initial_steps)
 
     def add_step(
         self,
@@ -32,78 +73,83 @@ class ExecutionHistory:
         parameters: str,
         result: str,
     ) -> None:
-        print(
-            "[agent/history.py][ExecutionHistory.add_step][Start] "
-            f"iteration={iteration} plan_summary={plan_summary} server={server} "
-            f"action={action}"
-        )
-        self.steps.append(
-            StepRecord(
-                iteration=iteration,
-                plan_summary=plan_summary,
-                server=server,
-                action=action,
-                parameters=parameters,
-                result=result,
-            )
+        self._append(
+            [
+                StepRecord(
+                    iteration=iteration,
+                    plan_summary=plan_summary,
+                    server=server,
+                    action=action,
+                    parameters=parameters,
+                    result=result,
+                )
+            ]
         )
-        print(
-            "[agent/history.py][ExecutionHistory.add_step][End] "
-            f"total_steps={len(self.steps)}"
+
+    def extend(self, pairs: Iterable[Tuple[PlanStep, MCPActionResult]], iteration: int) -> None:
+        """Record every executed (plan step, result) pair of an iteration at once."""
+        self._append(
+            [
+                StepRecord(
+                    iteration=iteration,
+                    plan_summary=step.summary,
+                    server=step.server,
+                    action=step.action,
+                    parameters=step.parameters_json,
+                    result=result.output,
+                )
+                for step, result in pairs
+            ]
         )
 
     def to_prompt(self) -> str:
-        """Return a human-readable summary for LLM prompting."""
-        print(
-            "[agent/history.py][ExecutionHistory.to_prompt][Start] "
-            f"steps_count={len(self.steps)}"
-        )
+        """Return a human-readable summary for LLM prompting.
+
+        The rendered text is cached and only the steps added since the previous
+        call are formatted. Dropping steps out of the window resets the cache.
+        """
         if not self.steps:
-            print(
-                "[agent/history.py][ExecutionHistory.to_prompt][End] result=(No previous steps executed.)"
-            )
             return "(No previous steps executed.)"
 
-        lines: List[str] = []
-        for step in self.steps:
-            lines.append(
-                "\n".join(
-                    [
-                        f"Iteration: {step.iteration}",
-                        f"Plan summary: {step.plan_summary}",
-                        f"Server: {step.server}",
-                        f"Action: {step.action}",
-                        f"Parameters: {step.parameters}",
-                        f"Result: {step.result}",
-                    ]
-                )
-            )
-        result_text = "\n\n".join(lines)
-        print(
-            "[agent/history.py][ExecutionHistory.to_prompt][End] "
-            f"result_length={len(result_text)}"
+        if self._rendered_count > len(self.steps):
+            # ``steps`` was shrunk from outside; start over.
+            self._rendered_prefix = ""
+            self._rendered_count = 0
+
+        if self._rendered_count < len(self.steps):
+            parts = [step.rendered for step in islice(self.steps, self._rendered_count, None)]
+            if self._rendered_count == 0 and self._omitted:
+                parts.insert(0, self._omitted_summary())
+            if self._rendered_prefix:
+                parts.insert(0, self._rendered_prefix)
+            self._rendered_prefix = "\n\n".join(parts)
+            self._rendered_count = len(self.steps)
+        return self._rendered_prefix
+
+    def _append(self, records: List[StepRecord]) -> None:
+        if self.window is not None:
+            overflow = len(self.steps) + len(records) - self.window
+            if overflow > 0:
+                for record in islice(chain(self.steps, records), overflow):
+                    if len(self._omitted) == self._omitted.maxlen:
+                        self._omitted_dropped += 1
+                    self._omitted.append((record.iteration, record.plan_summary))
+                self._rendered_prefix = ""
+                self._rendered_count = 0
+        self.steps.extend(records)
+
+    def _omitted_summary(self) -> str:
+        lines = ["Earlier steps (plan summaries only):"]
+        if self._omitted_dropped:
+            lines.append(f"({self._omitted_dropped} older steps omitted)")
+        lines.extend(
+            f"Iteration {iteration}: {'; '.join(summary for _, summary in group)}"
+            for iteration, group in groupby(self._omitted, key=lambda item: item[0])
         )
-        return result_text
+        return "\n".join(lines)
 
     def __len__(self) -> int:
-        print(
-            "[agent/history.py][ExecutionHistory.__len__][Start] "
-            f"steps_count={len(self.steps)}"
-        )
-        length = len(self.steps)
-        print(
-            "[agent/history.py][ExecutionHistory.__len__][End] "
-            f"length={length}"
-        )
-        return length
+        return len(self.steps)
 
     def __iter__(self):
-        print(
-            "[agent/history.py][ExecutionHistory.__iter__][Start] "
-            f"steps_count={len(self.steps)}"
-        )
-        iterator = iter(self.steps)
-        print(
-            "[agent/history.py][ExecutionHistory.__iter__][End] iterator_created=True"
-        )
-        return iterator
+        return iter(self.steps)
@@ -0,0 +1,29 @@
+"""JSON encoding helpers that use ``orjson`` when it is installed."""
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# ``orjson.JSONDecodeError`` subclasses the stdlib error, so one name covers both.
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(value: Any, indent: bool = False) -> str:
+    """Serialize ``value`` to compact UTF-8 JSON text, or 2-space indented JSON."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    if indent:
+        return json.dumps(value, ensure_ascii=False, indent=2)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or UTF-8 encoded bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
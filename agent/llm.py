@@ -1,17 +1,18 @@
 """LLM helper utilities for interacting with the OpenAI Completion API."""
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 from dataclasses import dataclass
-from typing import Any, List
+from typing import Any, Dict, Iterator, List, Optional
 
 from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CompletionMessage:
     """Represents a message sent to the LLM."""
 
@@ -19,38 +20,78 @@ class CompletionMessage:
     content: str
 
 
+def prompt_cache_key(system_prompt: str) -> str:
+    """Return a stable key that routes requests sharing ``system_prompt`` to the same prompt cache."""
+    return hashlib.blake2b(system_prompt.encode("utf-8"), digest_size=8).hexdigest()
+
+
 class LLMClient:
     """Thin wrapper around the OpenAI client for structured prompting."""
 
-    def __init__(self, model: str = "gpt-4.1-mini") -> None:
-        print(
-            "[agent/llm.py][LLMClient.__init__][Start] "
-            f"model={model}"
-        )
+    def __init__(self, model: str = "gpt-4.1-mini", embedding_model: str = "text-embedding-3-small") -> None:
         self._client = OpenAI()
         self.model = model
-        print(
-            "[agent/llm.py][LLMClient.__init__][End] client_initialized=True"
-        )
+        self.embedding_model = embedding_model
 
-    def complete(self, messages: List[CompletionMessage], **kwargs: Any) -> str:
-        """Send a completion request and return the model's response text."""
-        print(
-            "[agent/llm.py][LLMClient.complete][Start] "
-            f"messages_count={len(messages)} kwargs={kwargs}"
-        )
-        payload = [message.__dict__ for message in messages]
-        logger.debug("Sending completion payload: %s", json.dumps(payload, ensure_ascii=False, indent=2))
+    def complete(self, messages: List[CompletionMessage], cache_key: Optional[str] = None, **kwargs: Any) -> str:
+        """Send a completion request and return the model's response text.
+
+        ``cache_key`` is sent as OpenAI's ``prompt_cache_key`` so requests with the
+        same static prefix (e.g. the system prompt) are served from the prompt cache.
+        """
         response = self._client.chat.completions.create(
             model=self.model,
-            messages=[{"role": message.role, "content": message.content} for message in messages],
-            **kwargs,
+            messages=self._request_messages(messages),
+            **self._request_options(cache_key, kwargs),
         )
         choice = response.choices[0]
         text = choice.message.content or ""
         logger.debug("Received completion text: %s", text)
-        print(
-            "[agent/llm.py][LLMClient.complete][End] "
-            f"response_length={len(text)}"
-        )
         return text
+
+    def stream(
+        self,
+        messages: List[CompletionMessage],
+        cache_key: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Iterator[str]:
+        """Send a streaming completion request and yield text fragments as they arrive.
+
+        Closing the returned generator early also closes the underlying HTTP stream.
+        """
+        response = self._client.chat.completions.create(
+            model=self.model,
+            messages=self._request_messages(messages),
+            stream=True,
+            **self._request_options(cache_key, kwargs),
+        )
+        try:
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        finally:
+            response.close()
+
+    def embed(self, text: str) -> List[float]:
+        """Return the embedding vector of ``text``."""
+        response = self._client.embeddings.create(model=self.embedding_model, input=text)
+        return list(response.data[0].embedding)
+
+    @staticmethod
+    def _request_options(cache_key: Optional[str], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if cache_key is None:
+            return kwargs
+        # Sent through extra_body so older openai SDKs without the named argument work too.
+        extra_body = dict(kwargs.get("extra_body") or {})
+        extra_body["prompt_cache_key"] = cache_key
+        return {**kwargs, "extra_body": extra_body}
+
+    @staticmethod
+    def _request_messages(messages: List[CompletionMessage]) -> List[Dict[str, str]]:
+        request_messages = [{"role": message.role, "content": message.content} for message in messages]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sending completion payload: %s", json.dumps(request_messages, ensure_ascii=False, indent=2))
+        return request_messages
@@ -0,0 +1,180 @@
+"""Response caching in front of :class:`~agent.llm.LLMClient`."""
+from __future__ import annotations
+
+import logging
+import math
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import json_codec
+from .llm import CompletionMessage, LLMClient
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Sequence[float]]
+CacheKey = Tuple[Tuple[CompletionMessage, ...], str]
+
+
+class CachedLLMClient:
+    """Serve repeated prompts from memory instead of calling the LLM again.
+
+    Every request is first looked up by its messages and options in an LRU of
+    at most ``maxsize`` responses. When an
+    ``embedder`` is given, a miss then falls back to a semantic lookup: the
+    prompt embedding is compared with those of earlier prompts sent with the
+    same options, and the stored response is reused when the cosine similarity
+    reaches ``tau``. The semantic store keeps at most ``maxsize`` entries, and
+    only entries from earlier runs (see :meth:`begin_run`) can match: within a
+    run, each prompt nearly contains the previous one, so a match would replay
+    the previous plan or verdict. When ``path`` is given, the semantic store
+    is kept in that JSON Lines file, so entries from earlier invocations of
+    the CLI can match as well.
+    """
+
+    def __init__(
+        self,
+        llm: LLMClient,
+        embedder: Optional[Embedder] = None,
+        tau: float = 0.92,
+        maxsize: int = 128,
+        path: Optional[Path] = None,
+    ) -> None:
+        self.llm = llm
+        self.embedder = embedder
+        self.tau = tau
+        self.maxsize = maxsize
+        self.path = path
+        self._exact: OrderedDict[CacheKey, str] = OrderedDict()
+        self._semantic: Deque[Tuple[List[float], str, str, int]] = deque(maxlen=maxsize)
+        self._run = 0
+        if path is not None and embedder is not None:
+            self._load_semantic(path)
+
+    def _load_semantic(self, path: Path) -> None:
+        """Load stored semantic entries as belonging to an earlier run."""
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return
+        except OSError as exc:
+            logger.warning("Could not read semantic cache %s: %s", path, exc)
+            return
+        for line in lines:
+            try:
+                entry = json_codec.loads(line)
+                self._semantic.append((entry["embedding"], entry["options"], entry["response"], -1))
+            except (json_codec.JSONDecodeError, KeyError, TypeError):
+                continue
+        if len(lines) > 2 * self.maxsize:
+            # Rewrite the file with the surviving entries so it stays bounded.
+            self._write_semantic("".join(self._semantic_line(entry) for entry in self._semantic), "w")
+
+    @staticmethod
+    def _semantic_line(entry: Tuple[List[float], str, str, int]) -> str:
+        embedding, options, response, _ = entry
+        return json_codec.dumps({"embedding": embedding, "options": options, "response": response}) + "\n"
+
+    def _write_semantic(self, text: str, mode: str) -> None:
+        assert self.path is not None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open(mode, encoding="utf-8") as handle:
+                handle.write(text)
+        except OSError as exc:
+            logger.warning("Could not write semantic cache %s: %s", self.path, exc)
+
+    def begin_run(self) -> None:
+        """Start a new agent run; semantic matches only come from earlier runs."""
+        self._run += 1
+
+    def complete(self, messages: List[CompletionMessage], **kwargs: Any) -> str:
+        """Return a cached response when possible, otherwise call through."""
+        key = self._key(messages, kwargs)
+        cached, embedding = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = self.llm.complete(messages, **kwargs)
+        self._store(key, embedding, response)
+        return response
+
+    def stream(self, messages: List[CompletionMessage], **kwargs: Any) -> Iterator[str]:
+        """Streaming counterpart of :meth:`complete`.
+
+        A cache hit is yielded as a single fragment. A miss is stored once the
+        stream has been read to the end, or when it is closed early after a
+        complete JSON reply, as the evaluator does.
+        """
+        key = self._key(messages, kwargs)
+        cached, embedding = self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+        received: List[str] = []
+        finished = False
+        try:
+            for chunk in self.llm.stream(messages, **kwargs):
+                received.append(chunk)
+                yield chunk
+            finished = True
+        finally:
+            response = "".join(received)
+            if finished or _is_json(response):
+                self._store(key, embedding, response)
+
+    @staticmethod
+    def _key(messages: List[CompletionMessage], kwargs: Dict[str, Any]) -> CacheKey:
+        return tuple(messages), repr(sorted(kwargs.items()))
+
+    @staticmethod
+    def _prompt_text(messages: Tuple[CompletionMessage, ...]) -> str:
+        return "\n\n".join(f"{message.role}:\n{message.content}" for message in messages)
+
+    def _lookup(self, key: CacheKey) -> Tuple[Optional[str], Optional[List[float]]]:
+        cached = self._exact.get(key)
+        if cached is not None:
+            self._exact.move_to_end(key)
+            logger.debug("LLM cache hit (exact)")
+            return cached, None
+        if self.embedder is None:
+            return None, None
+
+        messages, options = key
+        embedding = _normalize(self.embedder(self._prompt_text(messages)))
+        best_score = -1.0
+        best_response: Optional[str] = None
+        for stored_embedding, stored_options, stored_response, stored_run in self._semantic:
+            if stored_options != options or stored_run == self._run:
+                continue
+            score = sum(a * b for a, b in zip(embedding, stored_embedding))
+            if score > best_score:
+                best_score, best_response = score, stored_response
+        if best_response is not None and best_score >= self.tau:
+            logger.debug("LLM cache hit (semantic, similarity=%.3f)", best_score)
+            return best_response, embedding
+        return None, embedding
+
+    def _store(self, key: CacheKey, embedding: Optional[List[float]], response: str) -> None:
+        self._exact[key] = response
+        if len(self._exact) > self.maxsize:
+            self._exact.popitem(last=False)
+        if embedding is not None:
+            entry = (embedding, key[1], response, self._run)
+            self._semantic.append(entry)
+            if self.path is not None:
+                self._write_semantic(self._semantic_line(entry), "a")
+
+
+def _is_json(text: str) -> bool:
+    try:
+        json_codec.loads(text)
+    except json_codec.JSONDecodeError:
+        return False
+    return True
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    if not norm:
+        return [0.0 for _ in vector]
+    return [value / norm for value in vector]
@@ -1,15 +1,17 @@
 """Simplified MCP client integration utilities."""
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, field
 from typing import Dict, Optional
 
+from . import json_codec
 from .config import MCPServerDefinition
-from .mcp_metadata import get_server_functions
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(slots=True)
 class MCPActionResult:
     """Represents the outcome of an executed MCP action."""
 
@@ -17,6 +19,12 @@ class MCPActionResult:
     action: str
     parameters: Dict[str, str]
     output: str
+    parameters_json: str = field(repr=False, compare=False)
+
+
+def serialize_parameters(parameters: Dict[str, str]) -> str:
+    """Serialize action parameters once for prompts, history, and tool calls."""
+    return json_codec.dumps(parameters)
 
 
 class MCPClient:
@@ -30,74 +38,59 @@ class MCPClient:
     """
 
     def __init__(self, registry: Dict[str, MCPServerDefinition]) -> None:
-        print(
-            "[agent/mcp_client.py][MCPClient.__init__][Start] "
-            f"registry_keys={list(registry.keys())}"
-        )
         self._registry = registry
-        self._log_available_functions()
-        print(
-            "[agent/mcp_client.py][MCPClient.__init__][End] registry_size="
-            f"{len(self._registry)}"
+        # The registry does not change while the agent runs, so the prompt
+        # description is serialized once.
+        self._description = json_codec.dumps(
+            {
+                name: {
+                    "command": definition.command,
+                    "args": definition.args,
+                    "env": definition.env,
+                }
+                for name, definition in registry.items()
+            },
+            indent=True,
         )
+        self._log_registered_servers()
 
-    def _log_available_functions(self) -> None:
-        """Log the available functions for each registered server."""
-        print(
-            "[agent/mcp_client.py][MCPClient._log_available_functions][Start] "
-            f"registry_size={len(self._registry)}"
-        )
-        for server_name in sorted(self._registry):
-            functions = get_server_functions(server_name)
-            print(
-                "[agent/mcp_client.py][MCPClient._log_available_functions][Info] "
-                f"server_name={server_name} functions={functions}"
-            )
-        print(
-            "[agent/mcp_client.py][MCPClient._log_available_functions][End] "
-            f"registry_size={len(self._registry)}"
-        )
+    def _log_registered_servers(self) -> None:
+        """Log the registered server names."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        logger.info("Registered MCP servers: %s", sorted(self._registry))
 
     def describe_servers(self) -> str:
         """Return a JSON string describing the available servers for prompting."""
-        print(
-            "[agent/mcp_client.py][MCPClient.describe_servers][Start] "
-            f"registry_size={len(self._registry)}"
-        )
-        payload = {
-            name: {
-                "command": definition.command,
-                "args": definition.args,
-                "env": definition.env,
-            }
-            for name, definition in self._registry.items()
-        }
-        description = json.dumps(payload, ensure_ascii=False, indent=2)
-        print(
-            "[agent/mcp_client.py][MCPClient.describe_servers][End] "
-            f"description_length={len(description)}"
-        )
-        return description
+        return self._description
 
-    def execute(self, server_name: str, action: str, parameters: Optional[Dict[str, str]] = None) -> MCPActionResult:
+    def execute(
+        self,
+        server_name: str,
+        action: str,
+        parameters: Optional[Dict[str, str]] = None,
+        parameters_json: Optional[str] = None,
+    ) -> MCPActionResult:
         """Execute an action using the specified MCP server.
 
-        Replace the simulated return value with real MCP invocation logic as needed.
+        ``parameters_json`` may carry the already serialized ``parameters`` so they
+        are not encoded again. Replace the simulated return value with real MCP
+        invocation logic as needed.
         """
-        print(
-            "[agent/mcp_client.py][MCPClient.execute][Start] "
-            f"server_name={server_name} action={action} parameters={parameters}"
-        )
         if server_name not in self._registry:
             raise ValueError(f"Unknown MCP server: {server_name}")
         params = parameters or {}
+        if parameters_json is None:
+            parameters_json = serialize_parameters(params)
         output = (
             "Simulated MCP execution. Integrate with actual MCP server here.\n"
-            f"Server: {server_name}\nAction: {action}\nParameters: {json.dumps(params, ensure_ascii=False)}"
+            f"Server: {server_name}\nAction: {action}\nParameters: {parameters_json}"
         )
-        result = MCPActionResult(server=server_name, action=action, parameters=params, output=output)
-        print(
-            "[agent/mcp_client.py][MCPClient.execute][End] "
-            f"server_name={server_name} action={action}"
+        logger.debug("Executed simulated MCP action server=%s action=%s", server_name, action)
+        return MCPActionResult(
+            server=server_name,
+            action=action,
+            parameters=params,
+            output=output,
+            parameters_json=parameters_json,
         )
-        return result
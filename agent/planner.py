@@ -1,56 +1,49 @@
 """Planning utilities for the MCP agent."""
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from typing import Dict, List
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from . import json_codec
 from .history import ExecutionHistory
-from .llm import CompletionMessage, LLMClient
-from .mcp_client import MCPClient
+from .llm import CompletionMessage, LLMClient, prompt_cache_key
+from .mcp_client import MCPClient, serialize_parameters
 
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None
 
-@dataclass
-class PlanStep:
-    """Represents a single step proposed by the planner."""
+logger = logging.getLogger(__name__)
 
-    summary: str
-    server: str
-    action: str
-    parameters: Dict[str, str]
+# summary, server, action, parameters, dependsOn
+_RawStep = Tuple[Any, Any, Any, Any, Any]
 
+if msgspec is not None:
 
-class Planner:
-    """Uses an LLM to create execution plans based on user goals."""
+    class _PlanStepSchema(msgspec.Struct):
+        summary: str
+        server: str
+        action: str
+        parameters: Dict[str, Any] = {}
+        dependsOn: Optional[int] = None
 
-    def __init__(self, llm: LLMClient, system_prompt: str) -> None:
-        print(
-            "[agent/planner.py][Planner.__init__][Start] "
-            f"llm={llm} system_prompt_length={len(system_prompt)}"
-        )
-        self.llm = llm
-        self.system_prompt = system_prompt
-        print(
-            "[agent/planner.py][Planner.__init__][End] "
-            f"system_prompt_length={len(self.system_prompt)}"
-        )
+    class _PlanSchema(msgspec.Struct):
+        steps: List[_PlanStepSchema]
 
-    def create_plan(self, goal: str, history: ExecutionHistory, mcp_client: MCPClient) -> List[PlanStep]:
-        """Generate a plan for the next iteration."""
-        print(
-            "[agent/planner.py][Planner.create_plan][Start] "
-            f"goal={goal} history_steps={len(history)}"
-        )
-        history_prompt = history.to_prompt()
-        servers_description = mcp_client.describe_servers()
-        user_prompt = f"""
-目的: {goal}
+    # Decodes and type-checks the planner reply in a single pass.
+    _PLAN_DECODER = msgspec.json.Decoder(_PlanSchema)
+else:
+    _PLAN_DECODER = None
+
+_USER_PROMPT_TEMPLATE = """目的: {goal}
 
 これまでの実行履歴:
-{history_prompt}
+{history}
 
 利用可能なMCPサーバの一覧 (JSON):
-{servers_description}
+{servers}
 
 上記の目的を達成するために、利用可能なMCPサーバのみを用いた実行計画を策定してください。
 出力は必ず以下のJSONスキーマに従ってください。
@@ -60,65 +53,135 @@ class Planner:
       "summary": "ステップの説明",
       "server": "使用するサーバ名",
       "action": "サーバで呼び出すアクションやコマンド",
-      "parameters": {{"key": "value"}}
+      "parameters": {{"key": "value"}},
+      "dependsOn": null
     }}
   ]
 }}
 
 各ステップはMCPサーバを具体的に使用する行動にしてください。
-"""
+前のステップの結果を必要とするステップは、"dependsOn" にそのステップの番号 (0始まり) を指定してください。
+依存関係のないステップは "dependsOn" を null にすると並列に実行されます。
+{hint}"""
+
+
+@dataclass(frozen=True, slots=True)
+class PlanStep:
+    """Represents a single step proposed by the planner."""
+
+    summary: str
+    server: str
+    action: str
+    parameters: Dict[str, str]
+    depends_on: Optional[int] = None
+    parameters_json: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "parameters_json", serialize_parameters(self.parameters))
+
+
+class Planner:
+    """Uses an LLM to create execution plans based on user goals."""
+
+    def __init__(self, llm: LLMClient, system_prompt: str) -> None:
+        self.llm = llm
+        self.system_prompt = system_prompt
+        self._cache_key = prompt_cache_key(system_prompt)
+
+    def create_plan(
+        self,
+        goal: str,
+        history: ExecutionHistory,
+        mcp_client: MCPClient,
+        hint: str = "",
+    ) -> List[PlanStep]:
+        """Generate a plan for the next iteration.
+
+        ``hint`` is appended to the prompt, e.g. to ask again after an empty plan.
+        """
+        history_prompt = history.to_prompt()
+        servers_description = mcp_client.describe_servers()
+        user_prompt = _USER_PROMPT_TEMPLATE.format_map(
+            {"goal": goal, "history": history_prompt, "servers": servers_description, "hint": hint}
+        ).rstrip()
         response = self.llm.complete(
             [
                 CompletionMessage(role="system", content=self.system_prompt),
-                CompletionMessage(role="user", content=user_prompt.strip()),
+                CompletionMessage(role="user", content=user_prompt),
             ],
+            cache_key=self._cache_key,
             temperature=0.2,
         )
         plan = self._parse_plan(response)
-        print(
-            "[agent/planner.py][Planner.create_plan][End] "
-            f"steps_count={len(plan)}"
-        )
+        logger.debug("Planner produced %s step(s)", len(plan))
         return plan
 
     def _parse_plan(self, response_text: str) -> List[PlanStep]:
-        print(
-            "[agent/planner.py][Planner._parse_plan][Start] "
-            f"response_length={len(response_text)}"
-        )
-        try:
-            data = json.loads(response_text)
-        except json.JSONDecodeError as exc:
-            raise ValueError("Planner response was not valid JSON") from exc
-
-        steps_data = data.get("steps")
-        if not isinstance(steps_data, list) or not steps_data:
-            raise ValueError("Planner response must include a non-empty 'steps' array")
+        if _PLAN_DECODER is not None:
+            raw_steps = self._decode_steps(response_text)
+        else:
+            raw_steps = self._load_steps(response_text)
 
         steps: List[PlanStep] = []
-        for entry in steps_data:
-            if not isinstance(entry, dict):
-                raise ValueError("Each plan step must be an object")
-            summary = str(entry.get("summary", ""))
-            server = str(entry.get("server", ""))
-            action = str(entry.get("action", ""))
-            parameters_field = entry.get("parameters", {})
+        for index, (summary, server, action, parameters_field, depends_on) in enumerate(raw_steps):
             if not summary or not server or not action:
                 raise ValueError("Plan steps must include summary, server, and action")
-            if not isinstance(parameters_field, dict):
-                raise ValueError("Plan step 'parameters' must be an object")
+            if depends_on is not None and (
+                type(depends_on) is not int or not 0 <= depends_on < index
+            ):
+                raise ValueError("Plan step 'dependsOn' must reference an earlier step index")
 
-            parameters = {str(key): str(value) for key, value in parameters_field.items()}
+            # JSON object keys are already strings; only the values need coercing.
+            parameters = {key: str(value) for key, value in parameters_field.items()}
             steps.append(
                 PlanStep(
                     summary=summary,
                     server=server,
                     action=action,
                     parameters=parameters,
+                    depends_on=depends_on,
                 )
             )
-        print(
-            "[agent/planner.py][Planner._parse_plan][End] "
-            f"steps_count={len(steps)}"
-        )
         return steps
+
+    @staticmethod
+    def _decode_steps(response_text: str) -> Iterable[_RawStep]:
+        try:
+            plan = _PLAN_DECODER.decode(response_text)
+        except msgspec.ValidationError as exc:
+            raise ValueError(f"Planner response does not match the plan schema: {exc}") from exc
+        except msgspec.DecodeError as exc:
+            raise ValueError("Planner response was not valid JSON") from exc
+        return [
+            (step.summary, step.server, step.action, step.parameters, step.dependsOn)
+            for step in plan.steps
+        ]
+
+    @staticmethod
+    def _load_steps(response_text: str) -> Iterable[_RawStep]:
+        try:
+            data = json_codec.loads(response_text)
+        except json_codec.JSONDecodeError as exc:
+            raise ValueError("Planner response was not valid JSON") from exc
+
+        steps_data = data.get("steps")
+        if not isinstance(steps_data, list):
+            raise ValueError("Planner response must include a 'steps' array")
+
+        raw_steps: List[_RawStep] = []
+        for entry in steps_data:
+            if not isinstance(entry, dict):
+                raise ValueError("Each plan step must be an object")
+            parameters_field = entry.get("parameters", {})
+            if not isinstance(parameters_field, dict):
+                raise ValueError("Plan step 'parameters' must be an object")
+            raw_steps.append(
+                (
+                    str(entry.get("summary", "")),
+                    str(entry.get("server", "")),
+                    str(entry.get("action", "")),
+                    parameters_field,
+                    entry.get("dependsOn"),
+                )
+            )
+        return raw_steps
@@ -4,78 +4,122 @@ from __future__ import annotations
 import argparse
 import logging
 import sys
+from functools import cached_property
 from pathlib import Path
+from typing import Dict
 
 from agent.agent import Agent
-from agent.config import ConfigurationError, load_mcp_servers, load_system_prompt
+from agent.config import ConfigurationError, MCPServerDefinition, load_mcp_servers, load_system_prompt
 from agent.evaluator import Evaluator
 from agent.executor import Executor
 from agent.history import ExecutionHistory
 from agent.llm import LLMClient
+from agent.llm_cache import CachedLLMClient
 from agent.mcp_client import MCPClient
 from agent.planner import Planner
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_SYSTEM_PROMPT_PATH = Path("config/system_prompt.txt")
 DEFAULT_MCP_SERVERS_PATH = Path("mcp_servers.json")
+DEFAULT_SEMANTIC_CACHE_PATH = Path.home() / ".cache" / "mcpclient" / "semantic_cache.jsonl"
+_LOG_LEVELS = {
+    name: getattr(logging, name)
+    for name in ("NOTSET", "DEBUG", "INFO", "WARN", "WARNING", "ERROR", "FATAL", "CRITICAL")
+}
 
 
-def parse_args(argv: list[str]) -> argparse.Namespace:
-    print(
-        "[main.py][parse_args][Start] "
-        f"argv={argv}"
-    )
+class AgentFactory:
+    """Build the agent components on first use from the parsed CLI options."""
+
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        system_prompt: str,
+        mcp_registry: Dict[str, MCPServerDefinition],
+    ) -> None:
+        self.args = args
+        self.system_prompt = system_prompt
+        self.mcp_registry = mcp_registry
+
+    @cached_property
+    def llm(self) -> CachedLLMClient:
+        base_llm = LLMClient(model=self.args.model)
+        if not self.args.semantic_cache:
+            return CachedLLMClient(base_llm)
+        return CachedLLMClient(base_llm, embedder=base_llm.embed, path=DEFAULT_SEMANTIC_CACHE_PATH)
+
+    @cached_property
+    def mcp_client(self) -> MCPClient:
+        return MCPClient(self.mcp_registry)
+
+    @cached_property
+    def planner(self) -> Planner:
+        return Planner(self.llm, self.system_prompt)
+
+    @cached_property
+    def executor(self) -> Executor:
+        return Executor(self.mcp_client)
+
+    @cached_property
+    def evaluator(self) -> Evaluator:
+        return Evaluator(self.llm, self.system_prompt)
+
+    @cached_property
+    def history(self) -> ExecutionHistory:
+        return ExecutionHistory()
+
+    @cached_property
+    def agent(self) -> Agent:
+        return Agent(planner=self.planner, executor=self.executor, evaluator=self.evaluator, history=self.history)
+
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="MCP ReAct agent")
     parser.add_argument("goal", nargs="?", help="Goal prompt provided by the user")
     parser.add_argument("--system-prompt", dest="system_prompt", default=str(DEFAULT_SYSTEM_PROMPT_PATH))
     parser.add_argument("--mcp-config", dest="mcp_config", default=str(DEFAULT_MCP_SERVERS_PATH))
     parser.add_argument("--model", dest="model", default="gpt-4.1-mini", help="OpenAI model name")
     parser.add_argument("--log-level", dest="log_level", default="INFO", help="Logging level")
-    parsed = parser.parse_args(argv)
-    print(
-        "[main.py][parse_args][End] "
-        f"goal={parsed.goal} system_prompt={parsed.system_prompt} mcp_config={parsed.mcp_config} "
-        f"model={parsed.model} log_level={parsed.log_level}"
+    parser.add_argument(
+        "--semantic-cache",
+        dest="semantic_cache",
+        action="store_true",
+        help="Reuse LLM responses of earlier runs for prompts whose embeddings are nearly identical",
     )
-    return parsed
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    return _PARSER.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> int:
-    print(
-        "[main.py][main][Start] "
-        f"argv={argv}"
-    )
     args = parse_args(argv or sys.argv[1:])
-    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+    logging.basicConfig(level=_LOG_LEVELS.get(args.log_level.upper(), logging.INFO))
+    # Logging is only configured once the arguments are known, so they are
+    # reported here rather than from parse_args.
+    logger.debug("Parsed arguments: %s", args)
 
     goal = args.goal or input("目的を入力してください: ").strip()
     if not goal:
         print("目標が入力されませんでした。終了します。")
-        print("[main.py][main][End] status=no_goal")
         return 1
 
     try:
         system_prompt = load_system_prompt(Path(args.system_prompt))
         mcp_registry = load_mcp_servers(Path(args.mcp_config))
     except ConfigurationError as exc:
-        logging.error("設定ファイルの読み込みに失敗しました: %s", exc)
-        print(
-            "[main.py][main][End] status=configuration_error "
-            f"error={exc}"
-        )
+        logger.error("設定ファイルの読み込みに失敗しました: %s", exc)
         return 1
 
-    llm = LLMClient(model=args.model)
-    mcp_client = MCPClient(mcp_registry)
-    planner = Planner(llm, system_prompt)
-    executor = Executor(mcp_client)
-    evaluator = Evaluator(llm, system_prompt)
-    history = ExecutionHistory()
-
-    agent = Agent(planner=planner, executor=executor, evaluator=evaluator, history=history)
-    agent.run(goal)
-    print(
-        "[main.py][main][End] status=success goal={goal}"
-    )
+    factory = AgentFactory(args, system_prompt, mcp_registry)
+    factory.llm.begin_run()
+    factory.agent.run(goal)
+    logger.debug("Finished goal: %s", goal)
     return 0
 
 
@@ -1,38 +1,587 @@
 """Minimal AutoGen-based ReAct agent implementation.
 
 This module exposes a CLI that accepts a user goal and iteratively plans,
-executes, and evaluates actions using an OpenAI model accessed via AutoGen.
-The agent only executes predefined Python scripts, satisfying the constraint
-that all tools are shell-invoked Python programs.
+executes, and evaluates actions using an OpenAI model. Replies are streamed
+from the OpenAI API by default; ``--no-stream`` uses AutoGen assistants instead.
+The agent only executes predefined Python scripts. By default each call runs in
+a separate process (a pooled worker for parallel-safe tools, otherwise a fresh
+interpreter) with a timeout and bounded output. Tools configured with
+``"sandbox": false`` are called in-process instead, where no timeout applies.
 """
 from __future__ import annotations
 
 import argparse
+import ast
+import asyncio
+import atexit
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import io
 import json
 import logging
+import math
+import multiprocessing
 import os
+import queue
+import re
+import runpy
+import sqlite3
 import subprocess
+import sys
+import tempfile
 import textwrap
-from dataclasses import dataclass
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List
-
-from autogen import AssistantAgent
+from multiprocessing.connection import Connection
+from collections import OrderedDict, deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from autogen import AssistantAgent
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
 
 DEFAULT_MODEL = "gpt-4.1-mini"
 MAX_ITERATIONS = 6
+# Only the last MAX_OUTPUT_BYTES of each output stream of a tool subprocess
+# are kept; tools running longer than TOOL_TIMEOUT_SECONDS are killed.
+MAX_OUTPUT_BYTES = 64 * 1024
+TOOL_TIMEOUT_SECONDS = 300
+# Worker processes kept for parallel-safe tool scripts. Tools mostly wait on
+# I/O, so this bounds plan parallelism rather than tracking the CPU count.
+TOOL_POOL_SIZE = 4
+# Number of history entries quoted in full in prompts, and of one-line
+# summaries kept for older entries; anything older is only counted.
+HISTORY_WINDOW = 12
+HISTORY_SUMMARY_LIMIT = 24
+# Parsed plans and evaluations: in-memory LRU size, plus the optional on-disk
+# store (enabled with --persist-cache) and how long its entries stay valid.
+RESULT_CACHE_SIZE = 128
+RESULT_CACHE_PATH = Path.home() / ".cache" / "mcpclient" / "plan_cache.sqlite"
+RESULT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+# Plans of achieved goals, reused as templates for similar goals when enabled
+# with --plan-templates.
+PLAN_TEMPLATE_PATH = Path.home() / ".cache" / "mcpclient" / "plan_templates.jsonl"
+PLAN_TEMPLATE_THRESHOLD = 0.90
+EMBEDDING_MODEL = "text-embedding-3-small"
+# HTTP/2 needs the optional h2 package; without it the client keeps HTTP/1.1
+# connections alive instead.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+# Output token caps; a JSON reply never needs more, and a runaway reply
+# stops early instead of burning tokens.
+PLANNER_MAX_TOKENS = 1024
+EVALUATOR_MAX_TOKENS = 256
+_LOG_LEVELS = {
+    name: getattr(logging, name)
+    for name in ("NOTSET", "DEBUG", "INFO", "WARN", "WARNING", "ERROR", "FATAL", "CRITICAL")
+}
+
+# Summary prefix of a plan's last step when the planner expects the plan to
+# complete the goal; if every step then succeeds, no evaluation is requested.
+_FINAL_MARKER = "FINAL:"
+
+_PLANNER_SYSTEM_MESSAGE = "You are a meticulous planner that outputs JSON only."
+_EVALUATOR_SYSTEM_MESSAGE = "You judge if the goal has been achieved. Respond in JSON only."
+# JSON schemas sent as ``response_format``. They are not strict: strict
+# schemas cannot describe ``parameters`` with arbitrary keys, so replies are
+# still validated after parsing. The planner schema covers both the plain
+# planning reply and the combined evaluation and planning reply.
+_PLAN_STEP_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "tool": {"type": "string"},
+        "parameters": {"type": "object", "additionalProperties": {"type": "string"}},
+    },
+    "required": ["summary", "tool", "parameters"],
+}
+_PLAN_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "plan",
+        "strict": False,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "achieved": {"type": "boolean"},
+                "reason": {"type": "string"},
+                "steps": {"type": "array", "items": _PLAN_STEP_SCHEMA},
+            },
+            "required": ["steps"],
+        },
+    },
+}
+# The combined reply lists "achieved" first so that streamed steps can wait
+# for it (see AutoGenReActAgent._astream_plan).
+_EVALUATE_AND_PLAN_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "evaluation_and_plan",
+        "strict": False,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "achieved": {"type": "boolean"},
+                "reason": {"type": "string"},
+                "steps": {"type": "array", "items": _PLAN_STEP_SCHEMA},
+            },
+            "required": ["achieved", "reason", "steps"],
+        },
+    },
+}
+_EVALUATION_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "evaluation",
+        "strict": False,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "achieved": {"type": "boolean"},
+                "reason": {"type": "string"},
+            },
+            "required": ["achieved", "reason"],
+        },
+    },
+}
+# AutoGen namespaces its response cache by this seed; deriving it from the
+# system messages gives every revision of them a separate cache.
+_CACHE_SEED = int.from_bytes(
+    hashlib.blake2b(
+        f"{_PLANNER_SYSTEM_MESSAGE}\n{_EVALUATOR_SYSTEM_MESSAGE}".encode("utf-8"),
+        digest_size=4,
+    ).digest(),
+    "big",
+)
+
+# The planner prompt is sent as two messages. The first only ever grows at its
+# end (the history is append-only), so consecutive iterations share a long
+# prefix that the provider's prompt cache can reuse; the tool list and output
+# format follow in a second message.
+_PLAN_CONTEXT_TEMPLATE = textwrap.dedent(
+    """
+    あなたは目的達成のための計画を作成するエージェントです。
+    目的: {goal}
+
+    これまでの実行履歴:
+    {history}
+    """
+).strip()
+
+_PLAN_INSTRUCTIONS_TEMPLATE = textwrap.dedent(
+    """
+    利用可能なツール:
+    {tools}
+
+    上記の目的を達成するための次の行動計画をJSONで出力してください。
+    フォーマット:
+    {{"steps": [{{"summary": "説明", "tool": "ツール名", "parameters": {{"key": "value"}} }}]}}
+    必ず存在するツール名のみを使用し、parametersは文字列値のJSONオブジェクトにしてください。
+    この計画の実行で目的が達成される見込みの場合は、最後のステップの summary を "FINAL:" で始めてください。
+    """
+).strip()
+
+# From the second iteration on, the evaluation of the previous plan and the
+# next plan come back from a single planner request that follows the same
+# context message as a plain planning request.
+_EVALUATE_AND_PLAN_INSTRUCTIONS_TEMPLATE = textwrap.dedent(
+    """
+    最新の実行結果:
+    {results}
+
+    まず、上記の結果で目的が達成されたかを評価してください。
+    達成されていない場合は、目的を達成するための次の行動計画も作成してください。
+
+    利用可能なツール:
+    {tools}
+
+    JSONで出力してください。
+    フォーマット:
+    {{"achieved": false, "reason": "評価の理由", "steps": [{{"summary": "説明", "tool": "ツール名", "parameters": {{"key": "value"}} }}]}}
+    達成済みの場合は "steps" を空のリストにしてください。
+    必ず存在するツール名のみを使用し、parametersは文字列値のJSONオブジェクトにしてください。
+    この計画の実行で目的が達成される見込みの場合は、最後のステップの summary を "FINAL:" で始めてください。
+    """
+).strip()
+
+_EVALUATION_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    あなたは目的達成度を評価する審査員です。
+    目的: {goal}
+
+    累積履歴:
+    {history}
+
+    最新の実行結果:
+    {results}
+
+    JSON形式で評価を返してください。例:
+    {{"achieved": true, "reason": "..."}}
+    """
+).strip()
+
+_PLAN_TEMPLATE_HINT = textwrap.dedent(
+    """
+    参考: 類似した目的を達成した過去の計画です。新しい目的に合わせて調整して使用してください。
+    {template}
+    """
+).strip()
+
+_HISTORY_ENTRY_FMT = "Iteration {iteration}: {summary}\nTool: {tool}\nParameters: {params}\nOutput: {out}"
+_HISTORY_SUMMARY_FMT = "Iteration {iteration}: {summary} ({tool}, return code {rc})"
+_RESULT_FMT = "Tool: {tool}\nParameters: {params}\nReturn code: {rc}\nOutput: {out}"
+
+
+def _loads(text: str) -> Any:
+    """Parse JSON with orjson when it is installed.
+
+    ``orjson.JSONDecodeError`` subclasses ``json.JSONDecodeError``, so callers
+    handle both backends with the same ``except`` clause.
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Models often wrap JSON replies in a Markdown code fence despite the prompt.
+_JSON_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def _strip_fences(text: str) -> str:
+    """Remove a Markdown code fence around an LLM reply, if there is one."""
+    return _JSON_FENCE.sub("", text)
+
+
+def _loads_reply(text: str) -> Any:
+    """Parse a JSON reply from the planner or evaluator."""
+    return _loads(_strip_fences(text))
+
+
+if msgspec is not None:
+
+    class _PlanStepSchema(msgspec.Struct):
+        summary: str
+        tool: str
+        parameters: Dict[str, Any] = {}
+
+    class _PlanSchema(msgspec.Struct):
+        steps: List[_PlanStepSchema]
+
+    # Decodes and type-checks the planner reply in a single pass.
+    _PLAN_DECODER = msgspec.json.Decoder(_PlanSchema)
+else:
+    _PLAN_DECODER = None
+
+
+def _decode_plan(response_text: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """Decode a planner reply with the msgspec schema into (summary, tool, parameters)."""
+    try:
+        plan = _PLAN_DECODER.decode(_strip_fences(response_text))
+    except msgspec.ValidationError as exc:
+        raise ValueError(f"Planner response does not match the plan schema: {exc}") from exc
+    except msgspec.DecodeError as exc:
+        raise ValueError(f"Planner response was not valid JSON: {response_text}") from exc
+    return [(step.summary, step.tool, step.parameters) for step in plan.steps]
 
 
-@dataclass
+def _load_plan(response_text: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """Parse and validate a planner reply by hand when msgspec is not installed."""
+    try:
+        data = _loads_reply(response_text)
+    except json.JSONDecodeError as exc:
+        raise ValueError(
+            f"Planner response was not valid JSON: {response_text}"
+        ) from exc
+
+    steps_field = data.get("steps")
+    if not isinstance(steps_field, list):
+        raise ValueError("Planner must return a non-empty 'steps' list")
+
+    raw_steps: List[Tuple[str, str, Dict[str, Any]]] = []
+    for entry in steps_field:
+        if not isinstance(entry, dict):
+            raise ValueError("Each plan step must be an object")
+        parameters_field = entry.get("parameters", {})
+        if not isinstance(parameters_field, dict):
+            raise ValueError("Plan step parameters must be an object")
+        raw_steps.append(
+            (str(entry.get("summary", "")), str(entry.get("tool", "")), parameters_field)
+        )
+    return raw_steps
+
+
+def _make_plan_step(summary: str, tool: str, parameters: Dict[str, Any]) -> PlanStep:
+    """Build a plan step from validated reply fields."""
+    summary = summary.strip()
+    tool = tool.strip()
+    if not summary or not tool:
+        raise ValueError("Plan steps must include 'summary' and 'tool'")
+    return PlanStep(summary=summary, tool=tool, parameters={k: str(v) for k, v in parameters.items()})
+
+
+def _plan_step_from_entry(entry: Any) -> PlanStep:
+    """Validate one streamed ``steps`` entry and build its plan step."""
+    if not isinstance(entry, dict):
+        raise ValueError("Each plan step must be an object")
+    parameters_field = entry.get("parameters", {})
+    if not isinstance(parameters_field, dict):
+        raise ValueError("Plan step parameters must be an object")
+    return _make_plan_step(str(entry.get("summary", "")), str(entry.get("tool", "")), parameters_field)
+
+
+def _plan_to_dicts(plan: Iterable[PlanStep]) -> List[Dict[str, Any]]:
+    """Return plan steps in the JSON shape the planner produces."""
+    return [
+        {"summary": step.summary, "tool": step.tool, "parameters": step.parameters}
+        for step in plan
+    ]
+
+
+def _dumps(value: Any) -> str:
+    """Serialize to compact JSON text, keeping non-ASCII characters as-is.
+
+    Uses orjson when it is installed; the stdlib fallback produces the same text.
+    """
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class HistoryBuffer:
+    """Execution history that keeps the latest entries in full and summarizes older ones.
+
+    Only the last ``window`` entries appear verbatim in prompts; each entry
+    pushed out of the window leaves behind its one-line summary. Only the
+    last ``summary_limit`` summaries are kept, and older entries are merely
+    counted, so the prompt size stays bounded however many iterations run.
+    """
+
+    _EMPTY_TEXT = "(まだ実行履歴はありません)"
+    _SUMMARY_HEADER = "それ以前の実行の要約:"
+    _OMITTED_FMT = "(さらに古い実行 {count} 件は省略)"
+
+    def __init__(self, window: int = HISTORY_WINDOW, summary_limit: int = HISTORY_SUMMARY_LIMIT) -> None:
+        self._entries: Deque[Tuple[str, str]] = deque(maxlen=window)
+        self._summaries: Deque[str] = deque(maxlen=summary_limit)
+        self._omitted = 0
+        self._length = 0
+        self._rendered_prefix = ""
+        self._rendered_count = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, entry: str, summary: Optional[str] = None) -> None:
+        """Record a history entry; ``summary`` replaces it once it leaves the window.
+
+        The summary defaults to the first line of ``entry``.
+        """
+
+        if len(self._entries) == self._entries.maxlen:
+            if len(self._summaries) == self._summaries.maxlen:
+                self._omitted += 1
+            self._summaries.append(self._entries[0][1])
+            # The rendered window no longer matches; rebuild it on next use.
+            self._rendered_prefix = ""
+            self._rendered_count = 0
+        self._entries.append((entry, summary or entry.partition("\n")[0]))
+        self._length += 1
+
+    def as_prompt_prefix(self) -> str:
+        """Return the history as prompt text.
+
+        While nothing has left the window, only entries appended since the
+        previous call are joined onto the cached text, so each iteration pays
+        for its own entries alone.
+        """
+
+        if not self._entries:
+            return self._EMPTY_TEXT
+        if self._rendered_count == 0:
+            parts = [entry for entry, _ in self._entries]
+            if self._summaries:
+                header = [self._SUMMARY_HEADER]
+                if self._omitted:
+                    header.append(self._OMITTED_FMT.format(count=self._omitted))
+                parts.insert(0, "\n".join([*header, *self._summaries]))
+            self._rendered_prefix = "\n\n".join(parts)
+        elif self._rendered_count < self._length:
+            new_entries = list(self._entries)[self._rendered_count - self._length:]
+            self._rendered_prefix = "\n\n".join(
+                [self._rendered_prefix, *(entry for entry, _ in new_entries)]
+            )
+        self._rendered_count = self._length
+        return self._rendered_prefix
+
+
+class ResultCache:
+    """LRU cache of parsed LLM results keyed by the SHA-256 of their prompt.
+
+    When ``path`` is given, entries are also written to a SQLite database so
+    later runs can reuse them; stored entries expire after ``ttl`` seconds.
+    Values must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = RESULT_CACHE_SIZE,
+        path: Optional[Path] = None,
+        ttl: float = RESULT_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, json TEXT, ts REAL)"
+                )
+                self._db.execute("DELETE FROM results WHERE ts < ?", (time.time() - ttl,))
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """Return the cache key for a prompt made of ``parts``."""
+
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for ``key``, or ``None``."""
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT json FROM results WHERE key = ? AND ts >= ?",
+            (key, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        value = _loads(row[0])
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key``."""
+
+        self._remember(key, value)
+        if self._db is not None:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, json, ts) VALUES (?, ?, ?)",
+                    (key, _dumps(value), time.time()),
+                )
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class PlanTemplateStore:
+    """Plans of achieved goals, looked up by goal-embedding similarity.
+
+    Entries are appended to a JSON-lines file holding the goal, its
+    L2-normalized embedding and the executed steps, and are all kept in memory
+    for a linear cosine scan.
+    """
+
+    def __init__(
+        self,
+        embedder: Callable[[str], Sequence[float]],
+        path: Path = PLAN_TEMPLATE_PATH,
+        threshold: float = PLAN_TEMPLATE_THRESHOLD,
+    ) -> None:
+        self.embedder = embedder
+        self.path = path
+        self.threshold = threshold
+        self._entries: List[Tuple[List[float], List[Dict[str, Any]]]] = []
+        if path.exists():
+            with path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        entry = _loads(line)
+                        self._entries.append((entry["embedding"], entry["steps"]))
+
+    def embed(self, goal: str) -> List[float]:
+        """Return the normalized embedding of ``goal``."""
+
+        vector = list(self.embedder(goal))
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def find(self, embedding: List[float]) -> Optional[List[Dict[str, Any]]]:
+        """Return the steps of the most similar stored goal at or above the threshold."""
+
+        best_score = self.threshold
+        best_steps: Optional[List[Dict[str, Any]]] = None
+        for stored_embedding, steps in self._entries:
+            score = sum(a * b for a, b in zip(embedding, stored_embedding))
+            if score >= best_score:
+                best_score, best_steps = score, steps
+        if best_steps is not None:
+            logging.debug("Found plan template (similarity=%.3f)", best_score)
+        return best_steps
+
+    def add(self, goal: str, embedding: List[float], steps: List[Dict[str, Any]]) -> None:
+        """Record the steps that achieved ``goal``."""
+
+        self._entries.append((embedding, steps))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(_dumps({"goal": goal, "embedding": embedding, "steps": steps}) + "\n")
+
+
+@dataclass(frozen=True, slots=True)
 class ToolDefinition:
     """Description of a callable tool."""
 
     name: str
     description: str
     script_path: Path
+    parallel_safe: bool = False
+    # Deterministic tools whose successful results may be reused for
+    # identical parameters.
+    pure: bool = False
+    # Set for tools that run in-process (``"sandbox": false``): the script's
+    # ``run_tool`` function, called with the step parameters.
+    function: Optional[Callable[[Dict[str, str]], str]] = field(
+        default=None, repr=False, compare=False
+    )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PlanStep:
     """Single step within a plan."""
 
@@ -41,7 +590,7 @@ class PlanStep:
     parameters: Dict[str, str]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToolResult:
     """Represents the outcome of executing a tool."""
 
@@ -51,64 +600,588 @@ class ToolResult:
     returncode: int
 
 
+# Redirecting stdout/stderr is process-wide, so in-process tool calls run one at a time.
+_IN_PROCESS_LOCK = threading.Lock()
+
+_TRUNCATION_MARKER = b"[... earlier output truncated ...]\n"
+
+
+def _keep_tail(buffer: bytearray, chunk: bytes) -> bool:
+    """Append ``chunk`` and drop all but the last ``MAX_OUTPUT_BYTES``; report whether bytes were dropped."""
+
+    buffer += chunk
+    if len(buffer) > MAX_OUTPUT_BYTES:
+        del buffer[:-MAX_OUTPUT_BYTES]
+        return True
+    return False
+
+
+def _drain(stream: Any, buffer: bytearray) -> None:
+    """Read ``stream`` to EOF, keeping only its last ``MAX_OUTPUT_BYTES``."""
+
+    truncated = False
+    while True:
+        chunk = stream.read1(MAX_OUTPUT_BYTES)
+        if not chunk:
+            break
+        truncated = _keep_tail(buffer, chunk) or truncated
+    stream.close()
+    if truncated:
+        buffer[:0] = _TRUNCATION_MARKER
+
+
+async def _adrain(stream: asyncio.StreamReader, buffer: bytearray) -> None:
+    """Asynchronous counterpart of :func:`_drain`."""
+
+    truncated = False
+    while True:
+        chunk = await stream.read(MAX_OUTPUT_BYTES)
+        if not chunk:
+            break
+        truncated = _keep_tail(buffer, chunk) or truncated
+    if truncated:
+        buffer[:0] = _TRUNCATION_MARKER
+
+
+def _run_subprocess(command: List[str]) -> Tuple[str, str, int]:
+    """Run a tool in its own interpreter with bounded output and a timeout.
+
+    Returns the decoded stdout, stderr and return code.
+    """
+
+    # Tools never read stdin; DEVNULL keeps them off the agent's terminal.
+    process = subprocess.Popen(
+        command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    stdout = bytearray()
+    stderr = bytearray()
+    readers = [
+        threading.Thread(target=_drain, args=(process.stdout, stdout), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    timed_out = False
+    try:
+        returncode = process.wait(timeout=TOOL_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        returncode = process.wait()
+        timed_out = True
+    for reader in readers:
+        reader.join()
+    stderr_text = stderr.decode("utf-8", "replace")
+    if timed_out:
+        stderr_text += f"\nTool timed out after {TOOL_TIMEOUT_SECONDS} seconds and was killed."
+    return stdout.decode("utf-8", "replace"), stderr_text, returncode
+
+
+async def _arun_subprocess(command: List[str]) -> Tuple[str, str, int]:
+    """Asynchronous counterpart of :func:`_run_subprocess`."""
+
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout = bytearray()
+    stderr = bytearray()
+    assert process.stdout is not None and process.stderr is not None
+    readers = asyncio.gather(_adrain(process.stdout, stdout), _adrain(process.stderr, stderr))
+    timed_out = False
+    try:
+        try:
+            returncode = await asyncio.wait_for(process.wait(), TOOL_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            process.kill()
+            returncode = await process.wait()
+            timed_out = True
+        await readers
+    except asyncio.CancelledError:
+        # The agent run was cancelled: do not leave the tool running behind it.
+        readers.cancel()
+        with contextlib.suppress(ProcessLookupError):
+            process.kill()
+        await process.wait()
+        with contextlib.suppress(asyncio.CancelledError):
+            await readers
+        raise
+    stderr_text = stderr.decode("utf-8", "replace")
+    if timed_out:
+        stderr_text += f"\nTool timed out after {TOOL_TIMEOUT_SECONDS} seconds and was killed."
+    return stdout.decode("utf-8", "replace"), stderr_text, returncode
+
+
+class _TailBuffer(io.TextIOBase):
+    """Text stream that keeps only the last ``MAX_OUTPUT_BYTES`` written to it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer = bytearray()
+        self._truncated = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._truncated = _keep_tail(self._buffer, text.encode("utf-8", "replace")) or self._truncated
+        return len(text)
+
+    def getvalue(self) -> str:
+        data = bytes(self._buffer)
+        if self._truncated:
+            data = _TRUNCATION_MARKER + data
+        return data.decode("utf-8", "replace")
+
+
+def _exit_status(exc: SystemExit) -> int:
+    """Return the process exit status ``exc`` stands for, printing a message code to stderr."""
+
+    if isinstance(exc.code, int) or exc.code is None:
+        return exc.code or 0
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+def _read_tail(handle: BinaryIO) -> str:
+    """Return the last ``MAX_OUTPUT_BYTES`` written to ``handle``, marking any cut."""
+
+    size = handle.seek(0, os.SEEK_END)
+    handle.seek(max(0, size - MAX_OUTPUT_BYTES))
+    data = handle.read()
+    if size > MAX_OUTPUT_BYTES:
+        data = _TRUNCATION_MARKER + data
+    return data.decode("utf-8", "replace")
+
+
+def _flush_std_streams() -> None:
+    for stream in (sys.stdout, sys.stderr):
+        if stream is not None:
+            stream.flush()
+
+
+@functools.lru_cache(maxsize=None)
+def _pooled_tool_function(script: str) -> Optional[Callable[[Dict[str, str]], str]]:
+    """Return the ``run_tool`` of a pooled tool script, importing it once per worker.
+
+    Only scripts defining ``run_tool`` at top level are imported; any other
+    script is run as ``__main__`` on every request, as in a subprocess.
+    """
+
+    path = Path(script)
+    tree = ast.parse(path.read_bytes(), script)
+    if not any(isinstance(node, ast.FunctionDef) and node.name == "run_tool" for node in tree.body):
+        return None
+    return _load_tool_function(path.stem, path)
+
+
+def _run_script(script: str, payload: str) -> Dict[str, Any]:
+    """Run a tool in this process and collect what it wrote.
+
+    Scripts defining ``run_tool`` are imported once and called with the
+    decoded payload; others run as ``__main__`` with the payload in ``argv``.
+
+    File descriptors 1 and 2 point at temporary files during the run, so output
+    of child processes and extension code is captured as in a subprocess run,
+    and only the last ``MAX_OUTPUT_BYTES`` of each stream are kept. The working
+    directory and environment are restored afterwards, so nothing a script
+    changes leaks into the next request served by this worker.
+    """
+
+    saved_argv = sys.argv
+    saved_streams = (sys.stdout, sys.stderr)
+    saved_cwd = os.getcwd()
+    saved_environ = dict(os.environ)
+    returncode = 0
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        _flush_std_streams()
+        saved_fds = (os.dup(1), os.dup(2))
+        os.dup2(stdout.fileno(), 1)
+        os.dup2(stderr.fileno(), 2)
+        sys.argv = [script, payload]
+        try:
+            try:
+                function = _pooled_tool_function(script)
+                if function is None:
+                    runpy.run_path(script, run_name="__main__")
+                else:
+                    print(function(_loads(payload)))
+            except SystemExit as exc:
+                returncode = _exit_status(exc)
+            except BaseException:  # noqa: BLE001 - report like an uncaught exception
+                traceback.print_exc()
+                returncode = 1
+        finally:
+            sys.stdout, sys.stderr = saved_streams
+            _flush_std_streams()
+            for fd, saved_fd in zip((1, 2), saved_fds):
+                os.dup2(saved_fd, fd)
+                os.close(saved_fd)
+            sys.argv = saved_argv
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_environ)
+        return {"stdout": _read_tail(stdout), "stderr": _read_tail(stderr), "returncode": returncode}
+
+
+def _worker_main(conn: Connection) -> None:
+    """Body of a :class:`WorkerPool` process: serve requests until the pipe closes."""
+
+    while True:
+        try:
+            request = _loads(conn.recv_bytes())
+        except EOFError:
+            break
+        response = _run_script(str(request["script"]), str(request["payload"]))
+        conn.send_bytes(_dumps(response).encode("utf-8"))
+
+
+class WorkerPool:
+    """Pre-started Python processes that run tool scripts without a fresh interpreter.
+
+    Workers are ``multiprocessing`` processes started from a forkserver where
+    the platform supports it, so each one is a cheap fork of a warm
+    interpreter. Requests and replies travel as JSON over a pipe. Each worker
+    handles one request at a time; idle workers wait in a queue, so concurrent
+    callers block until one is free. A worker that dies mid-request, or is
+    killed after ``TOOL_TIMEOUT_SECONDS``, is replaced before the next call.
+    """
+
+    def __init__(self, size: int) -> None:
+        if size < 1:
+            raise ValueError("WorkerPool size must be at least 1")
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: queue.Queue[Tuple[multiprocessing.process.BaseProcess, Connection]] = queue.Queue()
+        self._workers: List[Tuple[multiprocessing.process.BaseProcess, Connection]] = []
+        self._lock = threading.Lock()
+        for _ in range(size):
+            self._idle.put(self._spawn())
+        atexit.register(self.close)
+
+    def _spawn(self) -> Tuple[multiprocessing.process.BaseProcess, Connection]:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        worker = (process, parent_conn)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def run(self, script: str, payload: str) -> Tuple[str, str, int]:
+        """Run ``script`` with ``payload`` on an idle worker.
+
+        Returns the captured stdout, stderr and return code.
+        """
+
+        worker = self._idle.get()
+        process, conn = worker
+        try:
+            conn.send_bytes(_dumps({"script": script, "payload": payload}).encode("utf-8"))
+            if not conn.poll(TOOL_TIMEOUT_SECONDS):
+                process.kill()
+                returncode = self._replace(worker)
+                return (
+                    "",
+                    f"Tool timed out after {TOOL_TIMEOUT_SECONDS} seconds and was killed.",
+                    returncode,
+                )
+            data = conn.recv_bytes()
+        except (EOFError, OSError):
+            returncode = self._replace(worker)
+            return "", f"Tool worker exited unexpectedly (returncode={returncode})", returncode or 1
+        self._idle.put(worker)
+        response = _loads(data)
+        return response["stdout"], response["stderr"], int(response["returncode"])
+
+    def _replace(self, worker: Tuple[multiprocessing.process.BaseProcess, Connection]) -> int:
+        """Reap a dead or killed worker, start its replacement and return the old exit code."""
+
+        process, conn = worker
+        conn.close()
+        process.join()
+        with self._lock:
+            self._workers.remove(worker)
+        self._idle.put(self._spawn())
+        return process.exitcode or 0
+
+    def close(self) -> None:
+        """Stop all workers."""
+
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _, conn in workers:
+            conn.close()
+        for process, _ in workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+
 class ToolRegistry:
-    """Keeps track of available Python-script tools."""
+    """Keeps track of available Python-script tools.
 
-    def __init__(self, tools: Iterable[ToolDefinition]):
+    Unsandboxed tools are called in-process, parallel-safe tools run on a
+    :class:`WorkerPool` of long-lived processes, and all other tools get a
+    fresh interpreter per call.
+    """
+
+    def __init__(self, tools: Iterable[ToolDefinition], pool_size: Optional[int] = None):
         tools_list = list(tools)
-        print(
-            f"[minimal_autogen_agent.py][ToolRegistry.__init__] start tools={tools_list}"
-        )
         self._tools = {tool.name: tool for tool in tools_list}
-        print(
-            f"[minimal_autogen_agent.py][ToolRegistry.__init__] end tool_names={list(self._tools)}"
+        # Resolve every script once so a missing file fails here rather than
+        # on the first plan step that uses it.
+        self._argv_prefixes: Dict[str, Tuple[str, str]] = {}
+        for tool in tools_list:
+            try:
+                script = tool.script_path.resolve(strict=True)
+            except FileNotFoundError as exc:
+                raise FileNotFoundError(f"Tool script does not exist: {tool.script_path}") from exc
+            self._argv_prefixes[tool.name] = (sys.executable, str(script))
+        self._description = "\n".join(
+            f"- {tool.name}: {tool.description} (python {tool.script_path})"
+            for tool in tools_list
         )
+        self._pool: Optional[WorkerPool] = None
+        if any(tool.parallel_safe and tool.function is None for tool in tools_list):
+            self._pool = WorkerPool(pool_size or TOOL_POOL_SIZE)
 
     def describe(self) -> str:
         """Return a human-readable summary for prompts."""
 
-        print("[minimal_autogen_agent.py][ToolRegistry.describe] start")
-        lines = []
-        for tool in self._tools.values():
-            lines.append(
-                f"- {tool.name}: {tool.description} (python {tool.script_path})"
-            )
-        result = "\n".join(lines)
-        print(
-            f"[minimal_autogen_agent.py][ToolRegistry.describe] end result={result}"
-        )
-        return result
+        return self._description
+
+    def is_parallel_safe(self, tool_name: str) -> bool:
+        """Return whether the tool may run concurrently with other tool calls."""
+
+        tool = self._tools.get(tool_name)
+        return tool is not None and tool.parallel_safe
+
+    def cache_key(self, tool_name: str, parameters: Dict[str, str]) -> Optional[str]:
+        """Return the result cache key for a call, or ``None`` if its result must not be reused.
+
+        Results are reusable for pure tools, and for any call whose parameters
+        set ``"cacheable": "true"``.
+        """
+
+        tool = self._tools.get(tool_name)
+        if tool is None:
+            return None
+        if not tool.pure and str(parameters.get("cacheable", "")).strip().lower() != "true":
+            return None
+        return ResultCache.key("tool", tool_name, _dumps(dict(sorted(parameters.items()))))
 
     def execute(self, tool_name: str, parameters: Dict[str, str]) -> ToolResult:
         """Execute a tool and capture its output."""
 
-        print(
-            f"[minimal_autogen_agent.py][ToolRegistry.execute] start tool_name={tool_name} parameters={parameters}"
-        )
-        if tool_name not in self._tools:
-            raise ValueError(f"Unknown tool requested: {tool_name}")
+        tool, payload = self._prepare(tool_name, parameters)
+        argv_prefix = self._argv_prefixes[tool_name]
+        if tool.function is not None:
+            raw_stdout, raw_stderr, returncode = self._run_in_process(tool, parameters)
+        elif self._pool is not None and tool.parallel_safe:
+            raw_stdout, raw_stderr, returncode = self._pool.run(argv_prefix[1], payload)
+        else:
+            raw_stdout, raw_stderr, returncode = _run_subprocess([*argv_prefix, payload])
+        return self._make_result(tool_name, parameters, raw_stdout, raw_stderr, returncode)
 
-        tool = self._tools[tool_name]
-        payload = json.dumps(parameters, ensure_ascii=False)
-        command = ["python", str(tool.script_path), payload]
-        completed = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        stdout = completed.stdout.strip()
-        stderr = completed.stderr.strip()
+    async def aexecute(self, tool_name: str, parameters: Dict[str, str]) -> ToolResult:
+        """Asynchronous counterpart of :meth:`execute`.
+
+        Tools without a worker pool run through ``asyncio.create_subprocess_exec``;
+        pool calls are handed to a thread so the event loop stays free.
+        """
+
+        tool, payload = self._prepare(tool_name, parameters)
+        argv_prefix = self._argv_prefixes[tool_name]
+        if tool.function is not None:
+            raw_stdout, raw_stderr, returncode = await asyncio.to_thread(
+                self._run_in_process, tool, parameters
+            )
+        elif self._pool is not None and tool.parallel_safe:
+            raw_stdout, raw_stderr, returncode = await asyncio.to_thread(
+                self._pool.run, argv_prefix[1], payload
+            )
+        else:
+            raw_stdout, raw_stderr, returncode = await _arun_subprocess([*argv_prefix, payload])
+        return self._make_result(tool_name, parameters, raw_stdout, raw_stderr, returncode)
+
+    @staticmethod
+    def _run_in_process(tool: ToolDefinition, parameters: Dict[str, str]) -> Tuple[str, str, int]:
+        """Call an in-process tool, capturing what it prints like a subprocess would.
+
+        Output is bounded and stdin reads as empty, as for a subprocess, and
+        ``sys.exit()`` in the tool becomes its return code. There is no
+        timeout: a tool that hangs blocks the agent.
+        """
+
+        assert tool.function is not None
+        stdout = _TailBuffer()
+        stderr = _TailBuffer()
+        returncode = 0
+        with _IN_PROCESS_LOCK, contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            saved_stdin = sys.stdin
+            sys.stdin = io.StringIO()
+            try:
+                print(tool.function(parameters))
+            except SystemExit as exc:
+                returncode = _exit_status(exc)
+            except KeyboardInterrupt:
+                raise
+            except BaseException:  # noqa: BLE001 - reported to the agent as a failed tool run
+                traceback.print_exc()
+                returncode = 1
+            finally:
+                sys.stdin = saved_stdin
+        return stdout.getvalue(), stderr.getvalue(), returncode
+
+    @staticmethod
+    def _make_result(
+        tool_name: str,
+        parameters: Dict[str, str],
+        raw_stdout: str,
+        raw_stderr: str,
+        returncode: int,
+    ) -> ToolResult:
+        stdout = raw_stdout.strip()
+        stderr = raw_stderr.strip()
         combined_output = stdout if not stderr else f"{stdout}\n[stderr]\n{stderr}".strip()
-        result = ToolResult(
+        return ToolResult(
             tool=tool_name,
             parameters=parameters,
             output=combined_output or "<no output>",
-            returncode=completed.returncode,
-        )
-        print(
-            f"[minimal_autogen_agent.py][ToolRegistry.execute] end result={result}"
+            returncode=returncode,
         )
+
+    def _prepare(self, tool_name: str, parameters: Dict[str, str]) -> Tuple[ToolDefinition, str]:
+        """Look up the tool and encode the JSON payload passed to its script."""
+
+        if tool_name not in self._tools:
+            raise ValueError(f"Unknown tool requested: {tool_name}")
+
+        payload = _dumps(parameters)
+        return self._tools[tool_name], payload
+
+
+class _StepStream:
+    """Pull the objects of a reply's ``"steps"`` array out of streamed JSON text.
+
+    Each call to :meth:`feed` returns the step objects completed by the new
+    text, so callers can act on a step before the rest of the reply arrives.
+    :attr:`achieved` holds the reply's ``"achieved"`` flag once it has been
+    received ahead of the steps.
+    """
+
+    _STEPS_START = re.compile(r'"steps"\s*:\s*\[')
+    _ACHIEVED = re.compile(r'"achieved"\s*:\s*(true|false)')
+    _DECODER = json.JSONDecoder()
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._position: Optional[int] = None
+        self.finished = False
+        self.achieved: Optional[bool] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        self.text += chunk
+        if self.finished:
+            return []
+        if self._position is None:
+            match = self._STEPS_START.search(self.text)
+            head = self.text if match is None else self.text[: match.start()]
+            achieved = self._ACHIEVED.search(head)
+            if achieved is not None:
+                self.achieved = achieved.group(1) == "true"
+            if match is None:
+                return []
+            self._position = match.end()
+
+        entries: List[Any] = []
+        buffer = self.text
+        while True:
+            position = self._position
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            self._position = position
+            if position >= len(buffer):
+                break
+            if buffer[position] == "]":
+                self.finished = True
+                break
+            try:
+                entry, self._position = self._DECODER.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # the entry is still incomplete
+            entries.append(entry)
+        return entries
+
+
+class _PlanRunner:
+    """Start plan steps as soon as they are known while keeping tool side effects ordered.
+
+    Parallel-safe steps start immediately, only waiting for the latest
+    barrier; any other step is a barrier that waits for everything submitted
+    before it. Results come back in submission order. Successful results
+    of cacheable calls (see :meth:`ToolRegistry.cache_key`) are kept in
+    ``cache`` and returned for identical calls without running the tool; an
+    identical call submitted while the first still runs waits for its result.
+    """
+
+    def __init__(self, tools: ToolRegistry, cache: Optional[ResultCache] = None) -> None:
+        self.tools = tools
+        self.cache = cache
+        self._tasks: List[asyncio.Future[ToolResult]] = []
+        self._barrier: Optional[asyncio.Future[ToolResult]] = None
+        # Cacheable calls currently running, so identical steps wait for them.
+        self._in_flight: Dict[str, asyncio.Future[ToolResult]] = {}
+
+    def submit(self, step: PlanStep) -> None:
+        if self.tools.is_parallel_safe(step.tool):
+            prerequisites = [self._barrier] if self._barrier is not None else []
+            task = asyncio.ensure_future(self._run(step, prerequisites))
+        else:
+            task = asyncio.ensure_future(self._run(step, list(self._tasks)))
+            self._barrier = task
+        self._tasks.append(task)
+
+    def submit_all(self, steps: Iterable[PlanStep]) -> None:
+        for step in steps:
+            self.submit(step)
+
+    async def results(self) -> List[ToolResult]:
+        return list(await asyncio.gather(*self._tasks))
+
+    async def cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, step: PlanStep, prerequisites: List[asyncio.Future[ToolResult]]) -> ToolResult:
+        if prerequisites:
+            await asyncio.wait(prerequisites)
+        key = self.tools.cache_key(step.tool, step.parameters) if self.cache is not None else None
+        if key is None:
+            return await self.tools.aexecute(step.tool, step.parameters)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logging.debug("Reusing cached result of %s", step.tool)
+            return ToolResult(tool=step.tool, parameters=step.parameters, **cached)
+        running = self._in_flight.get(key)
+        if running is not None:
+            logging.debug("Waiting for the identical running call of %s", step.tool)
+            result = await asyncio.shield(running)
+            return ToolResult(
+                tool=step.tool, parameters=step.parameters, output=result.output, returncode=result.returncode
+            )
+        self._in_flight[key] = asyncio.current_task()
+        try:
+            result = await self.tools.aexecute(step.tool, step.parameters)
+        finally:
+            del self._in_flight[key]
+        if result.returncode == 0:
+            self.cache.put(key, {"output": result.output, "returncode": result.returncode})
         return result
 
 
@@ -120,230 +1193,496 @@ class AutoGenReActAgent:
         model: str,
         tools: ToolRegistry,
         max_iterations: int = MAX_ITERATIONS,
+        result_cache: Optional[ResultCache] = None,
+        plan_templates: Optional[PlanTemplateStore] = None,
+        stream_plans: bool = True,
     ) -> None:
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent.__init__] start model={model} max_iterations={max_iterations}"
-        )
-        if "OPENAI_API_KEY" not in os.environ:
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if api_key is None:
             raise EnvironmentError("OPENAI_API_KEY environment variable is required")
 
-        llm_config = {
-            "config_list": [
-                {
-                    "model": model,
-                    "api_key": os.environ["OPENAI_API_KEY"],
-                }
-            ],
-            "temperature": 0,
-        }
-        self.planner = AssistantAgent(
-            name="planner",
-            system_message="You are a meticulous planner that outputs JSON only.",
-            llm_config=llm_config,
-        )
-        self.evaluator = AssistantAgent(
-            name="evaluator",
-            system_message="You judge if the goal has been achieved. Respond in JSON only.",
-            llm_config=llm_config,
-        )
+        # With streaming, every request goes through one shared OpenAI client
+        # (see _create_client) and the AutoGen assistants are not needed.
+        self.planner: Optional[AssistantAgent] = None
+        self.evaluator: Optional[AssistantAgent] = None
+        if not stream_plans:
+            # Imported here because autogen is slow to import and is not
+            # needed unless its assistants are used.
+            from autogen import AssistantAgent
+
+            # Both assistants share these settings and differ only in their
+            # response format. AutoGen requires real dicts here, so read-only
+            # mapping proxies cannot be used.
+            llm_config = {
+                "config_list": [
+                    {
+                        "model": model,
+                        "api_key": api_key,
+                    }
+                ],
+                "temperature": 0,
+                "cache_seed": _CACHE_SEED,
+            }
+            self.planner = AssistantAgent(
+                name="planner",
+                system_message=_PLANNER_SYSTEM_MESSAGE,
+                llm_config={
+                    **llm_config,
+                    "max_tokens": PLANNER_MAX_TOKENS,
+                    "response_format": _PLAN_RESPONSE_FORMAT,
+                },
+            )
+            self.evaluator = AssistantAgent(
+                name="evaluator",
+                system_message=_EVALUATOR_SYSTEM_MESSAGE,
+                llm_config={
+                    **llm_config,
+                    "max_tokens": EVALUATOR_MAX_TOKENS,
+                    "response_format": _EVALUATION_RESPONSE_FORMAT,
+                },
+            )
         self.tools = tools
         self.max_iterations = max_iterations
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent.__init__] end tools={tools}"
-        )
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        self.plan_templates = plan_templates
+        self.stream_plans = stream_plans
+        self.model = model
+        self._api_key = api_key
+        self._client: Any = None
+        # The tool list never changes, so everything in the instructions but
+        # the latest results is rendered once here.
+        tools_description = self.tools.describe()
+        self._plan_instructions = _PLAN_INSTRUCTIONS_TEMPLATE.format(tools=tools_description)
+        results_head, _, results_tail = _EVALUATE_AND_PLAN_INSTRUCTIONS_TEMPLATE.partition("{results}")
+        self._evaluate_and_plan_head = results_head
+        self._evaluate_and_plan_tail = results_tail.format(tools=tools_description)
 
     def run(self, goal: str) -> None:
         """Execute the planning/execution/evaluation loop."""
 
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent.run] start goal={goal}"
-        )
-        history: List[str] = []
+        asyncio.run(self.arun(goal))
+
+    async def arun(self, goal: str) -> None:
+        """Asynchronous planning/execution/evaluation loop behind :meth:`run`.
+
+        When streaming, one OpenAI client serves every request of the run,
+        so its connections stay open from one iteration to the next.
+        """
+
+        if not self.stream_plans:
+            await self._arun(goal)
+            return
+        async with self._openai_session():
+            await self._arun(goal)
+
+    async def _arun(self, goal: str) -> None:
+        history = HistoryBuffer()
+        executed: List[PlanStep] = []
+        goal_embedding: Optional[List[float]] = None
+        template: Optional[List[Dict[str, Any]]] = None
+        if self.plan_templates is not None:
+            goal_embedding = await asyncio.to_thread(self.plan_templates.embed, goal)
+            template = self.plan_templates.find(goal_embedding)
+        results: List[ToolResult] = []
         for iteration in range(1, self.max_iterations + 1):
             logging.info("Planning iteration %s", iteration)
-            plan = self._request_plan(goal, history)
-            logging.debug("Plan: %s", plan)
-
-            results: List[ToolResult] = []
-            for step in plan:
-                result = self.tools.execute(step.tool, step.parameters)
+            # Steps start running as soon as they are known, possibly while
+            # the rest of the plan is still being generated.
+            runner = _PlanRunner(self.tools, self.result_cache)
+            try:
+                if iteration == 1:
+                    plan = await self._arequest_plan(goal, history, template, runner)
+                else:
+                    # The previous iteration's evaluation arrives with this plan.
+                    evaluation, plan = await self._aevaluate_and_plan(goal, history, results, runner)
+                    if self._report_evaluation(goal, evaluation, executed, goal_embedding):
+                        await runner.cancel()
+                        return
+                logging.debug("Plan: %s", plan)
+                results = await runner.results()
+            except BaseException:
+                await runner.cancel()
+                raise
+            executed.extend(plan)
+
+            for step, result in zip(plan, results):
                 logging.info(
                     "Executed %s (returncode=%s)", step.tool, result.returncode
                 )
-                results.append(result)
                 history.append(
-                    textwrap.dedent(
-                        f"Iteration {iteration}: {step.summary}\n"
-                        f"Tool: {step.tool}\n"
-                        f"Parameters: {json.dumps(step.parameters, ensure_ascii=False)}\n"
-                        f"Output: {result.output}"
-                    ).strip()
+                    _HISTORY_ENTRY_FMT.format(
+                        iteration=iteration,
+                        summary=step.summary,
+                        tool=step.tool,
+                        params=_dumps(step.parameters),
+                        out=result.output,
+                    ),
+                    summary=_HISTORY_SUMMARY_FMT.format(
+                        iteration=iteration,
+                        summary=step.summary,
+                        tool=step.tool,
+                        rc=result.returncode,
+                    ),
                 )
 
-            evaluation = self._evaluate(goal, history, results)
-            logging.info("Evaluation: %s", evaluation.get("reason", "(no reason)"))
-            if evaluation.get("achieved") is True:
-                print("✅ 目的を達成しました。")
-                print(f"理由: {evaluation.get('reason', '理由は提供されませんでした。')}")
-                print(
-                    f"[minimal_autogen_agent.py][AutoGenReActAgent.run] end goal={goal} status=achieved"
+            if plan[-1].summary.startswith(_FINAL_MARKER) and all(
+                result.returncode == 0 for result in results
+            ):
+                # The planner expected this plan to finish the goal and it ran
+                # cleanly, so skip the evaluation round trip.
+                self._report_evaluation(
+                    goal,
+                    {"achieved": True, "reason": f"最終ステップが成功しました: {results[-1].output}"},
+                    executed,
+                    goal_embedding,
                 )
                 return
 
-            if iteration == self.max_iterations:
-                break
+        # Nothing follows the last plan to carry its evaluation.
+        evaluation = await self._aevaluate(goal, history, results)
+        if self._report_evaluation(goal, evaluation, executed, goal_embedding):
+            return
 
         print("⚠️ 目的を達成できませんでした。追加の指示が必要かもしれません。")
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent.run] end goal={goal}"
-        )
 
-    def _request_plan(self, goal: str, history: List[str]) -> List[PlanStep]:
-        """Ask the planner LLM for the next execution plan."""
+    def _report_evaluation(
+        self,
+        goal: str,
+        evaluation: Dict[str, object],
+        executed: List[PlanStep],
+        goal_embedding: Optional[List[float]],
+    ) -> bool:
+        """Log an evaluation; on success record the plan template, report it and return ``True``."""
+
+        logging.info("Evaluation: %s", evaluation.get("reason", "(no reason)"))
+        if evaluation.get("achieved") is not True:
+            return False
+        if self.plan_templates is not None and goal_embedding is not None:
+            self.plan_templates.add(goal, goal_embedding, _plan_to_dicts(executed))
+        print("✅ 目的を達成しました。")
+        print(f"理由: {evaluation.get('reason', '理由は提供されませんでした。')}")
+        return True
+
+    async def _arequest_plan(
+        self,
+        goal: str,
+        history: HistoryBuffer,
+        template: Optional[List[Dict[str, Any]]] = None,
+        runner: Optional[_PlanRunner] = None,
+    ) -> List[PlanStep]:
+        """Ask the planner LLM for the next execution plan.
+
+        Every step of the returned plan is also submitted to ``runner`` when
+        one is given; with :attr:`stream_plans` the reply is streamed and each
+        step is submitted as soon as it has been received.
+
+        Plans are cached in :attr:`result_cache` per prompt, so an identical
+        request (for instance after an iteration that left the history
+        unchanged) reuses the parsed plan without another LLM call. A
+        ``template`` from :class:`PlanTemplateStore` is offered to the planner
+        as a prior plan to adapt.
+        """
+
+        context = _PLAN_CONTEXT_TEMPLATE.format(
+            goal=goal,
+            history=history.as_prompt_prefix(),
+        )
+        instructions = self._plan_instructions
+        if template is not None:
+            instructions = (
+                f"{instructions}\n\n{_PLAN_TEMPLATE_HINT.format(template=_dumps({'steps': template}))}"
+            )
+        cache_key = ResultCache.key("plan", context, instructions)
+        submitted = 0
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logging.debug("Reusing cached plan")
+            plan_steps = [PlanStep(**entry) for entry in cached]
+        else:
+            messages = [
+                {"role": "user", "content": context},
+                {"role": "user", "content": instructions},
+            ]
+            if self.stream_plans:
+                response_text, submitted = await self._astream_plan(messages, runner)
+            else:
+                response_text = self._extract_text(
+                    await self.planner.a_generate_reply(messages=messages)
+                )
+            plan_steps = self._parse_plan(response_text)
+            self.result_cache.put(cache_key, _plan_to_dicts(plan_steps))
+        if runner is not None:
+            runner.submit_all(plan_steps[submitted:])
+        return plan_steps
 
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent._request_plan] start goal={goal} history_length={len(history)}"
+    async def _aevaluate_and_plan(
+        self,
+        goal: str,
+        history: HistoryBuffer,
+        results: List[ToolResult],
+        runner: Optional[_PlanRunner] = None,
+    ) -> Tuple[Dict[str, object], List[PlanStep]]:
+        """Evaluate the latest results and, unless achieved, get the next plan in one request.
+
+        The plan is empty when the goal was achieved. Replies are cached in
+        :attr:`result_cache` per prompt, and plan steps are submitted to
+        ``runner`` as in :meth:`_arequest_plan`.
+        """
+
+        context = _PLAN_CONTEXT_TEMPLATE.format(
+            goal=goal,
+            history=history.as_prompt_prefix(),
         )
-        history_text = "\n\n".join(history) if history else "(まだ実行履歴はありません)"
-        prompt = textwrap.dedent(
-            f"""
-            あなたは目的達成のための計画を作成するエージェントです。
-            目的: {goal}
-
-            これまでの実行履歴:
-            {history_text}
-
-            利用可能なツール:
-            {self.tools.describe()}
-
-            上記の目的を達成するための次の行動計画をJSONで出力してください。
-            フォーマット:
-            {{"steps": [{{"summary": "説明", "tool": "ツール名", "parameters": {{"key": "value"}} }}]}}
-            必ず存在するツール名のみを使用し、parametersは文字列値のJSONオブジェクトにしてください。
-            """
-        ).strip()
-        response = self.planner.generate_reply(
-            messages=[{"role": "user", "content": prompt}]
+        instructions = (
+            f"{self._evaluate_and_plan_head}{self._format_results(results)}"
+            f"{self._evaluate_and_plan_tail}"
         )
-        response_text = self._extract_text(response)
+        cache_key = ResultCache.key("evaluate_and_plan", context, instructions)
+        submitted = 0
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logging.debug("Reusing cached evaluation and plan")
+            evaluation = cached["evaluation"]
+            plan_steps = [PlanStep(**entry) for entry in cached["steps"]]
+        else:
+            messages = [
+                {"role": "user", "content": context},
+                {"role": "user", "content": instructions},
+            ]
+            if self.stream_plans:
+                response_text, submitted = await self._astream_plan(messages, runner, evaluated=True)
+            else:
+                response_text = self._extract_text(
+                    await self.planner.a_generate_reply(messages=messages)
+                )
+            try:
+                data = _loads_reply(response_text)
+            except json.JSONDecodeError as exc:
+                raise ValueError(
+                    f"Planner response was not valid JSON: {response_text}"
+                ) from exc
+            if not isinstance(data, dict):
+                raise ValueError("Planner response must be a JSON object")
+            evaluation = {"achieved": data.get("achieved"), "reason": data.get("reason")}
+            if evaluation["reason"] is None:
+                del evaluation["reason"]
+            plan_steps = [] if data.get("achieved") is True else self._parse_plan(response_text)
+            self.result_cache.put(
+                cache_key, {"evaluation": evaluation, "steps": _plan_to_dicts(plan_steps)}
+            )
+        if runner is not None:
+            runner.submit_all(plan_steps[submitted:])
+        return evaluation, plan_steps
+
+    async def _astream_plan(
+        self,
+        messages: List[Dict[str, str]],
+        runner: Optional[_PlanRunner],
+        evaluated: bool = False,
+    ) -> Tuple[str, int]:
+        """Stream a planner reply, submitting each step to ``runner`` once it is complete.
+
+        This talks to the OpenAI API directly because AutoGen only returns
+        whole replies. When the reply is ``evaluated`` (it also carries the
+        evaluation of the previous plan), steps are held back until
+        ``"achieved": false`` has arrived, so nothing runs for a goal that is
+        already achieved; steps still held at the end are left to the caller.
+        Returns the full reply text and the number of steps submitted.
+        """
+
+        async with self._openai_session() as client:
+            stream = await client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "system", "content": _PLANNER_SYSTEM_MESSAGE}, *messages],
+                temperature=0,
+                max_tokens=PLANNER_MAX_TOKENS,
+                response_format=_EVALUATE_AND_PLAN_RESPONSE_FORMAT if evaluated else _PLAN_RESPONSE_FORMAT,
+                stream=True,
+            )
+            steps = _StepStream()
+            held: List[PlanStep] = []
+            submitted = 0
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                held.extend(_plan_step_from_entry(entry) for entry in steps.feed(delta))
+                if runner is None or not held or (evaluated and steps.achieved is not False):
+                    continue
+                runner.submit_all(held)
+                submitted += len(held)
+                held = []
+        return steps.text, submitted
+
+    @contextlib.asynccontextmanager
+    async def _openai_session(self) -> AsyncIterator[Any]:
+        """Provide the OpenAI client for the requests made inside the block.
+
+        Nested blocks, such as a request made during :meth:`arun`, reuse the
+        open client; the outermost block closes it, so no connection pool
+        outlives the event loop it was created on.
+        """
+
+        if self._client is not None:
+            yield self._client
+            return
+        self._client = self._create_client()
         try:
-            data = json.loads(response_text)
-        except json.JSONDecodeError as exc:
-            raise ValueError(
-                f"Planner response was not valid JSON: {response_text}"
-            ) from exc
+            yield self._client
+        finally:
+            client, self._client = self._client, None
+            await client.close()
+
+    def _create_client(self) -> Any:
+        """Return an async OpenAI client that keeps its connections alive between requests."""
+
+        import httpx
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(
+            api_key=self._api_key,
+            http_client=httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=16),
+                timeout=httpx.Timeout(600.0, connect=5.0),
+            ),
+        )
+
+    @staticmethod
+    def _parse_plan(response_text: str) -> List[PlanStep]:
+        """Validate the ``steps`` of a planner reply and build :class:`PlanStep` objects."""
 
-        steps_field = data.get("steps")
-        if not isinstance(steps_field, list) or not steps_field:
+        if _PLAN_DECODER is not None:
+            raw_steps = _decode_plan(response_text)
+        else:
+            raw_steps = _load_plan(response_text)
+        if not raw_steps:
             raise ValueError("Planner must return a non-empty 'steps' list")
 
-        plan_steps: List[PlanStep] = []
-        for entry in steps_field:
-            if not isinstance(entry, dict):
-                raise ValueError("Each plan step must be an object")
-            summary = str(entry.get("summary", "")).strip()
-            tool = str(entry.get("tool", "")).strip()
-            parameters_field = entry.get("parameters", {})
-            if not summary or not tool:
-                raise ValueError("Plan steps must include 'summary' and 'tool'")
-            if not isinstance(parameters_field, dict):
-                raise ValueError("Plan step parameters must be an object")
-            parameters = {str(k): str(v) for k, v in parameters_field.items()}
-            plan_steps.append(PlanStep(summary=summary, tool=tool, parameters=parameters))
-
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent._request_plan] end plan_steps={plan_steps}"
-        )
-        return plan_steps
+        return [
+            _make_plan_step(summary, tool, parameters_field)
+            for summary, tool, parameters_field in raw_steps
+        ]
 
-    def _evaluate(
+    @staticmethod
+    def _format_results(results: List[ToolResult]) -> str:
+        # str.join materializes a generator into a list first anyway.
+        return "\n\n".join(
+            [
+                _RESULT_FMT.format(
+                    tool=result.tool,
+                    params=_dumps(result.parameters),
+                    rc=result.returncode,
+                    out=result.output,
+                )
+                for result in results
+            ]
+        ) or "(今回の実行結果はありません)"
+
+    async def _aevaluate(
         self,
         goal: str,
-        history: List[str],
+        history: HistoryBuffer,
         results: List[ToolResult],
     ) -> Dict[str, object]:
-        """Ask the evaluator LLM whether the goal has been achieved."""
+        """Ask the evaluator LLM whether the goal has been achieved.
 
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent._evaluate] start goal={goal} history_length={len(history)} results_length={len(results)}"
-        )
-        history_text = "\n\n".join(history) if history else "(まだ実行履歴はありません)"
-        latest_results = "\n\n".join(
-            textwrap.dedent(
-                f"Tool: {result.tool}\n"
-                f"Parameters: {json.dumps(result.parameters, ensure_ascii=False)}\n"
-                f"Return code: {result.returncode}\n"
-                f"Output: {result.output}"
-            ).strip()
-            for result in results
-        ) or "(今回の実行結果はありません)"
-        prompt = textwrap.dedent(
-            f"""
-            あなたは目的達成度を評価する審査員です。
-            目的: {goal}
-
-            累積履歴:
-            {history_text}
-
-            最新の実行結果:
-            {latest_results}
-
-            JSON形式で評価を返してください。例:
-            {{"achieved": true, "reason": "..."}}
-            """
-        ).strip()
-        response = self.evaluator.generate_reply(
-            messages=[{"role": "user", "content": prompt}]
+        Evaluations are cached in :attr:`result_cache` per prompt, like plans.
+        """
+
+        latest_results = self._format_results(results)
+        prompt = _EVALUATION_PROMPT_TEMPLATE.format(
+            goal=goal,
+            history=history.as_prompt_prefix(),
+            results=latest_results,
         )
-        response_text = self._extract_text(response)
+        cache_key = ResultCache.key("evaluation", prompt)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logging.debug("Reusing cached evaluation")
+            return cached
+
+        messages = [{"role": "user", "content": prompt}]
+        if self.stream_plans:
+            async with self._openai_session() as client:
+                completion = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "system", "content": _EVALUATOR_SYSTEM_MESSAGE}, *messages],
+                    temperature=0,
+                    max_tokens=EVALUATOR_MAX_TOKENS,
+                    response_format=_EVALUATION_RESPONSE_FORMAT,
+                )
+            response_text = completion.choices[0].message.content or ""
+        else:
+            response_text = self._extract_text(
+                await self.evaluator.a_generate_reply(messages=messages)
+            )
         try:
-            evaluation = json.loads(response_text)
+            evaluation = _loads_reply(response_text)
         except json.JSONDecodeError as exc:
             raise ValueError(
                 f"Evaluator response was not valid JSON: {response_text}"
             ) from exc
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent._evaluate] end evaluation={evaluation}"
-        )
+        self.result_cache.put(cache_key, evaluation)
         return evaluation
 
     @staticmethod
     def _extract_text(reply: object) -> str:
         """Normalize AutoGen replies to plain text."""
 
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent._extract_text] start type={type(reply)}"
-        )
-        if isinstance(reply, str):
-            result = reply
-        elif isinstance(reply, dict) and "content" in reply:
-            result = str(reply["content"])
-        else:
-            raise TypeError(f"Unexpected reply type: {type(reply)!r}")
-        print(
-            f"[minimal_autogen_agent.py][AutoGenReActAgent._extract_text] end result={result}"
-        )
-        return result
+        if type(reply) is str:
+            return reply
+        try:
+            return str(reply["content"])  # type: ignore[index]
+        except (TypeError, KeyError) as exc:
+            if isinstance(reply, str):
+                return reply
+            raise TypeError(f"Unexpected reply type: {type(reply)!r}") from exc
 
 
-def build_agent(model: str | None = None) -> AutoGenReActAgent:
-    """Factory function to create the agent with default tools."""
+def _openai_embedder() -> Callable[[str], Sequence[float]]:
+    """Return a function embedding text with the OpenAI embeddings API."""
+
+    from openai import OpenAI
+
+    client = OpenAI()
+
+    def embed(text: str) -> Sequence[float]:
+        return client.embeddings.create(model=EMBEDDING_MODEL, input=text).data[0].embedding
+
+    return embed
+
+
+@functools.lru_cache(maxsize=None)
+def _default_tools() -> ToolRegistry:
+    """Load the bundled tool registry once; agents built later share it and its worker pool."""
 
-    print(f"[minimal_autogen_agent.py][build_agent] start model={model}")
     config_path = Path(__file__).parent / "config" / "tools.json"
-    tool_definitions = load_tool_definitions(config_path)
-    tools = ToolRegistry(tool_definitions)
-    agent = AutoGenReActAgent(model=model or DEFAULT_MODEL, tools=tools)
-    print(f"[minimal_autogen_agent.py][build_agent] end agent={agent}")
-    return agent
+    return ToolRegistry(load_tool_definitions(config_path))
+
+
+def build_agent(
+    model: str | None = None,
+    persist_cache: bool = False,
+    plan_templates: bool = False,
+    stream_plans: bool = True,
+) -> AutoGenReActAgent:
+    """Factory function to create the agent with default tools."""
+
+    return AutoGenReActAgent(
+        model=model or DEFAULT_MODEL,
+        tools=_default_tools(),
+        result_cache=ResultCache(path=RESULT_CACHE_PATH if persist_cache else None),
+        plan_templates=PlanTemplateStore(_openai_embedder()) if plan_templates else None,
+        stream_plans=stream_plans,
+    )
 
 
 def load_tool_definitions(config_path: Path) -> List[ToolDefinition]:
     """Load tool definitions from a JSON file."""
 
-    print(
-        f"[minimal_autogen_agent.py][load_tool_definitions] start config_path={config_path}"
-    )
     if not config_path.exists():
         raise FileNotFoundError(f"Tool configuration file not found: {config_path}")
 
@@ -353,7 +1692,12 @@ def load_tool_definitions(config_path: Path) -> List[ToolDefinition]:
     #     {
     #       "name": "tool_name",              # Unique identifier used in plans
     #       "description": "Human readable",   # Description provided to the LLM
-    #       "script_path": "tools/tool.py"     # Path to the executable Python script
+    #       "script_path": "tools/tool.py",    # Path to the executable Python script
+    #       "parallel_safe": true,             # Optional; may run concurrently (default false)
+    #       "pure": true,                      # Optional; identical calls reuse results (default false)
+    #       "sandbox": false                   # Optional; false calls the script's run_tool()
+    #                                          # in-process instead of spawning it, without a
+    #                                          # timeout (default true)
     #     }
     #   ]
     # }
@@ -370,19 +1714,25 @@ def load_tool_definitions(config_path: Path) -> List[ToolDefinition]:
         raise ValueError("Tool configuration must contain a non-empty 'tools' list")
 
     tool_definitions: List[ToolDefinition] = []
-    for index, entry in enumerate(tools_field):
-        print(
-            f"[minimal_autogen_agent.py][load_tool_definitions] processing index={index} entry={entry}"
-        )
+    for entry in tools_field:
         if not isinstance(entry, dict):
             raise ValueError("Each tool definition must be an object")
 
         name = str(entry.get("name", "")).strip()
         description = str(entry.get("description", "")).strip()
         script_path_value = str(entry.get("script_path", "")).strip()
+        parallel_safe = entry.get("parallel_safe", False)
+        pure = entry.get("pure", False)
+        sandbox = entry.get("sandbox", True)
 
         if not name or not description or not script_path_value:
             raise ValueError("Tool definitions must include name, description, and script_path")
+        if not isinstance(parallel_safe, bool):
+            raise ValueError("Tool definition 'parallel_safe' must be a boolean")
+        if not isinstance(pure, bool):
+            raise ValueError("Tool definition 'pure' must be a boolean")
+        if not isinstance(sandbox, bool):
+            raise ValueError("Tool definition 'sandbox' must be a boolean")
 
         script_path = (config_path.parent / script_path_value).resolve()
         if not script_path.exists():
@@ -393,19 +1743,32 @@ def load_tool_definitions(config_path: Path) -> List[ToolDefinition]:
                 name=name,
                 description=description,
                 script_path=script_path,
+                parallel_safe=parallel_safe,
+                pure=pure,
+                function=None if sandbox else _load_tool_function(name, script_path),
             )
         )
 
-    print(
-        f"[minimal_autogen_agent.py][load_tool_definitions] end tool_definitions={tool_definitions}"
-    )
     return tool_definitions
 
 
-def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
-    """Parse CLI arguments."""
+def _load_tool_function(name: str, script_path: Path) -> Callable[[Dict[str, str]], str]:
+    """Import a tool script as a module and return its ``run_tool`` function."""
+
+    spec = importlib.util.spec_from_file_location(f"_autogen_tool_{name}", script_path)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"Tool script cannot be imported: {script_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    function = getattr(module, "run_tool", None)
+    if not callable(function):
+        raise ValueError(f"Unsandboxed tool script must define run_tool(parameters): {script_path}")
+    return function
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
 
-    print(f"[minimal_autogen_agent.py][parse_args] start argv={argv}")
     parser = argparse.ArgumentParser(description="Minimal AutoGen ReAct agent")
     parser.add_argument("goal", nargs="?", help="Goal prompt provided by the user")
     parser.add_argument(
@@ -418,34 +1781,58 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
         default="INFO",
         help="Logging level (e.g., INFO, DEBUG)",
     )
-    args = parser.parse_args(argv)
-    print(f"[minimal_autogen_agent.py][parse_args] end args={args}")
-    return args
+    parser.add_argument(
+        "--persist-cache",
+        action="store_true",
+        help=f"Keep parsed plans and evaluations in {RESULT_CACHE_PATH} for reuse across runs",
+    )
+    parser.add_argument(
+        "--plan-templates",
+        action="store_true",
+        help="Offer the plan of a previously achieved, similar goal to the planner as a template",
+    )
+    parser.add_argument(
+        "--no-stream",
+        dest="stream_plans",
+        action="store_false",
+        help="Use AutoGen assistants with complete replies instead of streaming from the OpenAI API",
+    )
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse CLI arguments."""
+
+    return _PARSER.parse_args(argv)
 
 
 def main(argv: List[str] | None = None) -> int:
     """Command-line entry point."""
 
-    print(f"[minimal_autogen_agent.py][main] start argv={argv}")
     args = parse_args(argv)
-    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+    logging.basicConfig(level=_LOG_LEVELS.get(args.log_level.upper(), logging.INFO))
 
     goal = args.goal or input("目的を入力してください: ").strip()
     if not goal:
         print("目標が入力されませんでした。終了します。")
-        print("[minimal_autogen_agent.py][main] end return=1")
         return 1
 
-    agent = build_agent(model=args.model)
+    agent = build_agent(
+        model=args.model,
+        persist_cache=args.persist_cache,
+        plan_templates=args.plan_templates,
+        stream_plans=args.stream_plans,
+    )
     try:
-        agent.run(goal)
+        asyncio.run(agent.arun(goal))
     except Exception as exc:  # pragma: no cover - CLI safety
         logging.exception("エージェントの実行中にエラーが発生しました")
         print(f"❌ エージェントの実行に失敗しました: {exc}")
-        print("[minimal_autogen_agent.py][main] end return=1")
         return 1
 
-    print("[minimal_autogen_agent.py][main] end return=0")
     return 0
 
 
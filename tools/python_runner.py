@@ -5,35 +5,49 @@ contain a ``code`` field with Python statements to execute. When the code
 defines a variable named ``result``, its representation is printed. Otherwise,
 the script prints a generic completion message. Any stderr output is bubbled
 back to the caller to support debugging from the agent loop.
+
+The agent can also import this module and call :func:`run_tool` with the
+parameters directly: in its own process for tools configured with
+``"sandbox": false``, or once per pooled worker process otherwise. Compiled
+code is then reused for repeated snippets within that process.
 """
 from __future__ import annotations
 
 import argparse
 import json
-from types import SimpleNamespace
+from functools import lru_cache
+from types import CodeType, SimpleNamespace
 from typing import Any, Dict
 
+@lru_cache(maxsize=128)
+def _compile(code: str) -> CodeType:
+    """Compile a snippet once; the agent often resends identical code."""
+
+    return compile(code, "<python_runner>", "exec")
+
 
 def execute_user_code(code: str) -> str:
     """Execute user-provided code in an isolated namespace."""
 
-    print(f"[python_runner.py][execute_user_code] start code={code}")
     namespace: Dict[str, Any] = {}
-    exec(code, {}, namespace)  # noqa: S102 - intentional execution of trusted code
+    exec(_compile(code), {}, namespace)  # noqa: S102 - intentional execution of trusted code
 
     if "result" in namespace:
-        output = repr(namespace["result"])
-        print(f"[python_runner.py][execute_user_code] end output={output}")
-        return output
-    default_message = "コードの実行が完了しました (result 変数は定義されていません)。"
-    print(f"[python_runner.py][execute_user_code] end output={default_message}")
-    return default_message
+        return repr(namespace["result"])
+    return "コードの実行が完了しました (result 変数は定義されていません)。"
+
+
+def run_tool(parameters: Dict[str, str]) -> str:
+    """In-process entry point used by the agent instead of the command line."""
+
+    if "code" not in parameters:
+        raise ValueError("Parameters must contain a 'code' field")
+    return execute_user_code(str(parameters["code"]))
 
 
 def parse_args(argv: list[str] | None = None) -> SimpleNamespace:
     """Parse command line arguments."""
 
-    print(f"[python_runner.py][parse_args] start argv={argv}")
     parser = argparse.ArgumentParser(description="Execute Python code for the AutoGen tool")
     parser.add_argument(
         "payload",
@@ -48,19 +62,15 @@ def parse_args(argv: list[str] | None = None) -> SimpleNamespace:
     if not isinstance(payload, dict) or "code" not in payload:
         raise SystemExit("Payload must be a JSON object containing a 'code' field")
 
-    args = SimpleNamespace(code=str(payload["code"]))
-    print(f"[python_runner.py][parse_args] end args={args}")
-    return args
+    return SimpleNamespace(code=str(payload["code"]))
 
 
 def main(argv: list[str] | None = None) -> int:
     """Script entry point."""
 
-    print(f"[python_runner.py][main] start argv={argv}")
     args = parse_args(argv)
     output = execute_user_code(args.code)
     print(output)
-    print("[python_runner.py][main] end return=0")
     return 0
 
 